@@ -23,10 +23,17 @@ try:
     from starstruct.bitfield import BitField
     assert BitField
 
+    from starstruct.dispatcher import Dispatcher
+    assert Dispatcher
+
+    from starstruct.limits import Limits, LimitError
+    assert Limits
+    assert LimitError
+
     # TODO: make this import more automatic
     from starstruct.element import Element
     from starstruct.elementbase import ElementBase
-    from starstruct.elementcallable import ElementCallable
+    from starstruct.elementcallable import ElementCallable, Incremental, PendingChecks
     from starstruct.elementconstant import ElementConstant
     from starstruct.elementpad import ElementPad
     from starstruct.elementenum import ElementEnum
@@ -45,6 +52,8 @@ try:
     assert Element
     assert ElementBase
     assert ElementCallable
+    assert Incremental
+    assert PendingChecks
     assert ElementConstant
     assert ElementPad
     assert ElementEnum
@@ -56,6 +65,7 @@ try:
     assert ElementVariable
     assert ElementDiscriminated
 
-    __all__ = ['Message', 'Mode', 'StarTuple', 'BitField']
+    __all__ = ['Message', 'Mode', 'StarTuple', 'BitField', 'Incremental', 'PendingChecks',
+               'Limits', 'LimitError', 'Dispatcher']
 except ImportError:  # pragma: no cover (manual test)
     pass
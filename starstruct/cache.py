@@ -0,0 +1,133 @@
+"""
+Bounded caches of packed and unpacked messages.
+
+Messages that are packed (or unpacked) with exactly the same values over and
+over again, such as heartbeats, acknowledgements and polling responses, can
+keep the result of the most recent distinct values in a least recently used
+cache:
+
+.. code-block:: python
+
+    Heartbeat = Message('Heartbeat', fields, pack_cache=64)
+
+    Heartbeat.pack(node=3, state=State.up)
+    print(Heartbeat.pack_cache.info())
+
+    Response = Message('Response', fields, unpack_cache=256)
+
+    # The same record is returned for the same bytes
+    Response.unpack(frame)
+
+Records returned from the unpack cache are shared, so every list in them
+(such as the items of variable elements) is converted to a tuple.
+"""
+
+import collections
+import collections.abc
+import enum
+import hashlib
+import numbers
+import struct
+
+from typing import Hashable
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    """
+    A least recently used cache with hit, miss and eviction counters.
+
+    :param maxsize: The maximum number of entries
+    """
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('invalid cache size: {}'.format(maxsize))
+
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        """Return the cached value of a key, or None"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        """Cache a value, evicting the least recently used entry if needed"""
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry, the counters are kept"""
+        self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        """Return the counters and size of the cache"""
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+
+def freeze(value) -> Hashable:
+    """
+    Convert the values to pack into a hashable key.  The type of every value
+    is part of the key, so values that are equal but pack differently (or
+    not at all), such as ``1`` and ``1.0``, are not confused.
+
+    :raises TypeError: If a value is not hashable
+    """
+    if isinstance(value, collections.abc.Mapping):
+        return frozenset((key, freeze(val)) for key, val in value.items())
+    elif hasattr(value, '_asdict'):
+        return freeze(value._asdict())
+    elif isinstance(value, (list, tuple)):
+        return (type(value),) + tuple(freeze(val) for val in value)
+
+    elif isinstance(value, float):
+        # 0.0 and -0.0 (and NaNs with different payloads) are equal, but pack
+        # into different bytes
+        return (float, struct.pack('<d', value))
+
+    hash(value)
+    return (type(value), value)
+
+
+# Larger buffers are cached by their length and digest rather than their bytes
+MAX_KEY_SIZE = 256
+
+
+def buffer_key(buf) -> Hashable:
+    """Return the key of a buffer to unpack"""
+    if len(buf) <= MAX_KEY_SIZE:
+        return bytes(buf)
+    return (len(buf), hashlib.sha1(buf).digest())
+
+
+def immutable(value):
+    """Convert every list in an unpacked value into a tuple"""
+    if isinstance(value, list):
+        return tuple(immutable(val) for val in value)
+    elif isinstance(value, tuple) and hasattr(value, '_asdict'):
+        return value._make(immutable(val) for val in value)
+    return value
+
+
+def is_immutable(value) -> bool:
+    """Return whether a value (and every value in it) can never change"""
+    if isinstance(value, tuple):
+        return all(is_immutable(val) for val in value)
+    return isinstance(value, (numbers.Number, str, bytes, enum.Enum, type(None)))
@@ -0,0 +1,157 @@
+"""
+Encode only the fields that changed since the previous message.
+
+.. code-block:: python
+
+    codec = DeltaCodec(Telemetry)
+
+    # The sender
+    delta = codec.encode(previous, current)
+
+    # The receiver, which has the same previous message
+    current = codec.decode(previous, delta)
+
+A delta is a bitmap with one bit for each field of the message (in order, the
+lowest bit of the first byte is the first field), followed by the packed bytes
+of each changed field.  Fields are compared by their packed bytes, not by
+their values.  The size of a variable element is written before its bytes, as
+an unsigned LEB128 number.  Length, discriminator and checksum fields are just
+fields, so they are included whenever they change.
+"""
+
+import struct
+
+from starstruct.message import Message
+
+
+def _write_size(out: bytearray, size: int) -> None:
+    """Append an unsigned LEB128 number"""
+    while size > 0x7f:
+        out.append(0x80 | (size & 0x7f))
+        size >>= 7
+    out.append(size)
+
+
+def _read_size(buf, offset: int) -> tuple:
+    """Read an unsigned LEB128 number, returns the number and the next offset"""
+    size = 0
+    shift = 0
+    while True:
+        if offset >= len(buf):
+            raise struct.error('delta ends in the middle of a size')
+        byte = buf[offset]
+        offset += 1
+        size |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (size, offset)
+        shift += 7
+
+
+class DeltaCodec(object):
+    """
+    Encode and decode the changes between consecutive messages.
+
+    :param message: The message of the records
+    """
+    def __init__(self, message: Message):
+        self.message = message
+
+        # The named elements, and whether each has a fixed size
+        self._fields = [(elem, not isinstance(elem.format, (Message, dict)))
+                        for elem in message._elements.values() if elem.name]  # pylint: disable=protected-access
+        self._bitmap_size = (len(self._fields) + 7) // 8
+
+    def _pack(self, record) -> bytes:
+        """Pack a record (or return packed bytes as they are)"""
+        if isinstance(record, (bytes, bytearray, memoryview)):
+            return bytes(record)
+        return self.message.pack(record)
+
+    def _spans(self, packed):
+        """Return the bytes of every element of a packed message"""
+        (spans, _, _) = self.message._walk(packed)  # pylint: disable=protected-access
+        return [(elem, packed[start:end]) for elem, start, end in spans]
+
+    def encode(self, previous, current) -> bytes:
+        """
+        Encode the fields of the current record that differ from the previous
+        record.
+
+        :param previous: The previous record (or its packed bytes), or None to
+            encode every field
+        :param current: The current record (or its packed bytes)
+        """
+        old = {} if previous is None else \
+            {elem.name: data for elem, data in self._spans(self._pack(previous)) if elem.name}
+
+        bitmap = bytearray(self._bitmap_size)
+        values = bytearray()
+        new = {elem.name: data for elem, data in self._spans(self._pack(current)) if elem.name}
+        for index, (elem, fixed) in enumerate(self._fields):
+            data = new[elem.name]
+            if old.get(elem.name) == data:
+                continue
+
+            bitmap[index // 8] |= 1 << (index % 8)
+            if not fixed:
+                _write_size(values, len(data))
+            values += data
+
+        return bytes(bitmap + values)
+
+    def decode(self, previous, delta: bytes, checks=None):
+        """
+        Apply a delta to the previous record.
+
+        :param previous: The previous record (or its packed bytes), or None if
+            the delta has every field
+        :param delta: The encoded delta
+        :param checks: See :py:meth:`starstruct.message.Message.unpack_partial`
+        :returns: The current record
+        """
+        return self.message.unpack(self.apply(previous, delta), checks)
+
+    def apply(self, previous, delta: bytes) -> bytes:
+        """
+        Apply a delta to the previous record, without unpacking the result.
+
+        :returns: The packed current record
+        """
+        if len(delta) < self._bitmap_size:
+            raise struct.error('delta of {} requires at least {} bytes'.format(
+                self.message.name, self._bitmap_size))
+
+        old = {} if previous is None else \
+            {elem: data for elem, data in self._spans(self._pack(previous))}
+
+        offset = self._bitmap_size
+        changed = {}
+        for index, (elem, fixed) in enumerate(self._fields):
+            if not delta[index // 8] & (1 << (index % 8)):
+                if elem not in old:
+                    raise ValueError('delta of {} has no value for {}'.format(self.message.name, elem.name))
+                continue
+
+            if fixed:
+                size = elem._struct.size  # pylint: disable=protected-access
+            else:
+                (size, offset) = _read_size(delta, offset)
+            if offset + size > len(delta):
+                raise struct.error('delta of {} ends in the middle of {}'.format(self.message.name, elem.name))
+
+            changed[elem] = delta[offset:offset + size]
+            offset += size
+
+        if offset != len(delta):
+            raise ValueError('delta of {} has {} unused bytes'.format(self.message.name, len(delta) - offset))
+
+        parts = []
+        for elem in self.message._elements.values():  # pylint: disable=protected-access
+            if elem in changed:
+                parts.append(changed[elem])
+            elif elem in old:
+                parts.append(old[elem])
+            else:
+                # Padding of a message without a previous record
+                parts.append(elem.pack({}))
+        return b''.join(parts)
@@ -0,0 +1,133 @@
+"""
+Route raw frames to messages by a header id.
+
+This is like a discriminated element, but for frames that don't share an
+outer message.  Only the id is unpacked from the header, and the body is then
+unpacked directly with the message registered for that id.
+
+.. code-block:: python
+
+    Header = Message('Header', [('id', 'H'), ('length', 'H')], Mode.Big)
+
+    dispatcher = Dispatcher({
+        1: StatusMessage,
+        2: DataMessage,
+    }, Header, field='id')
+
+    (frame_id, body) = dispatcher.unpack(frame)
+
+The header can also be given as the offset and struct format of the id:
+
+.. code-block:: python
+
+    dispatcher = Dispatcher(registry, (0, 'H'), mode=Mode.Big)
+
+By default the body starts after the header (or after the id), use the
+body_offset parameter when the registered messages include the header.
+"""
+
+import collections
+import enum
+import struct
+
+from typing import Optional
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class Dispatcher(object):
+    """
+    Route frames to messages by an id in their header.
+
+    :param registry: A dictionary from id (or enum member) to Message
+    :param header: A fixed size header Message, or a tuple of the offset and
+        struct format of the id
+    :param field: The name of the id field when a header Message is given
+    :param mode: The mode of the id format when an offset is given
+    :param body_offset: The offset of the body within each frame
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, registry: dict, header, field: Optional[str]=None,
+                 mode: Optional[Mode]=Mode.Native, body_offset: Optional[int]=None):
+        if isinstance(header, Message):
+            (offset, id_format) = self._find_field(header, field)
+            id_struct = struct.Struct(header.mode.value + id_format)
+            header_size = header._fixed.size  # pylint: disable=protected-access
+        elif isinstance(header, tuple) and len(header) == 2:
+            (offset, id_format) = header
+            id_struct = struct.Struct(mode.value + id_format)
+            header_size = offset + id_struct.size
+        else:
+            raise TypeError('invalid header: {}'.format(header))
+
+        if len(id_struct.unpack(bytes(id_struct.size))) != 1:
+            raise TypeError('header id format {} is not a single value'.format(id_format))
+
+        self._offset = offset
+        self._id_struct = id_struct
+        self.body_offset = header_size if body_offset is None else body_offset
+
+        self._registry = {}
+        for key, message in registry.items():
+            self.register(key, message)
+
+        self.counts = collections.Counter()
+        self.misses = 0
+
+    @staticmethod
+    def _find_field(header, field):
+        """Return the offset and struct format of a field in a header message"""
+        if header._fixed is None:  # pylint: disable=protected-access
+            raise TypeError('header {} is not a fixed size message'.format(header.name))
+
+        offset = 0
+        for elem in header._elements.values():  # pylint: disable=protected-access
+            raw_format = elem.raw_format()
+            if elem.name == field:
+                return (offset, raw_format)
+            offset += struct.calcsize(header.mode.value + raw_format)
+
+        raise TypeError('header {} has no field {}'.format(header.name, field))
+
+    def register(self, key, message: Message) -> None:
+        """
+        Register the message for an id.
+
+        :param key: The raw id, or an enum member whose value is the id
+        :param message: The message to unpack the body of the frame with
+        """
+        if not isinstance(message, Message):
+            raise TypeError('invalid message for id {}: {}'.format(key, message))
+
+        if isinstance(key, enum.Enum):
+            key = key.value
+        self._registry[key] = message
+
+    def dispatch(self, frame):
+        """
+        Return the id of a frame and the message registered for it.
+
+        :raises ValueError: If no message is registered for the id
+        """
+        frame_id = self._id_struct.unpack_from(frame, self._offset)[0]
+        try:
+            message = self._registry[frame_id]
+        except KeyError:
+            self.misses += 1
+            raise ValueError('no message registered for id {}'.format(frame_id))
+
+        self.counts[frame_id] += 1
+        return (frame_id, message)
+
+    def unpack(self, frame, checks=None):
+        """
+        Unpack the body of a frame with the message registered for its id.
+
+        :param frame: The bytes of the entire frame
+        :param checks: See :py:meth:`starstruct.message.Message.unpack_partial`
+        :returns: The id of the frame and the unpacked body
+        """
+        (frame_id, message) = self.dispatch(frame)
+        body = memoryview(frame)[self.body_offset:]
+        return (frame_id, message.unpack(body, checks))
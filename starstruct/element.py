@@ -1,5 +1,7 @@
 """StarStruct element class."""
 
+import collections.abc
+
 from typing import Optional, Tuple
 
 from starstruct.modes import Mode
@@ -11,6 +13,34 @@ def register(cls):
     return cls
 
 
+class TupleFields(collections.abc.Mapping):
+    """
+    A read only mapping of field names to the values of a tuple (or any other
+    sequence) in field order, so that tuples can be packed by elements without
+    copying them into a dictionary.
+
+    :param values: The values, in field order
+    :param index: A dictionary from field name to index
+    """
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index: dict):
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._values[self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
 class Element(object):
     """
     A class factory that determines the type of the field passed in, and
@@ -18,6 +48,11 @@ class Element(object):
     """
     elementtypes = []
 
+    # Elements that set this are passed the bytes of the other elements in the
+    # message (as a dict of memoryviews keyed by element name) when they are
+    # packed or unpacked.
+    uses_spans = False
+
     @classmethod
     def register(cls, element):
         """Function used to register new element subclasses."""
@@ -136,6 +171,18 @@ class Element(object):
         """
         raise NotImplementedError
 
+    def raw_format(self) -> Optional[str]:
+        """
+        Return the struct format of this element (without the mode character)
+        if the element packs and unpacks exactly the values the struct module
+        does, so it can be packed and unpacked together with its neighbours in
+        a single struct.  Padding elements, which have no value, also qualify.
+
+        :returns: The struct format, or None if the element transforms its
+            values in any way.
+        """
+        return None
+
     def pack(self, msg: dict) -> bytes:
         """
         Require element objects to implement this function.
@@ -145,6 +192,18 @@ class Element(object):
         """
         raise NotImplementedError
 
+    def pack_trusted(self, msg: dict) -> bytes:
+        """
+        Pack values that are already in the form :py:meth:`make` returns,
+        skipping any conversions and checks, see
+        :py:meth:`starstruct.message.Message.pack_trusted`.
+
+        By default this is the same as :py:meth:`pack`.
+
+        :param msg: The made values to pack into bytes
+        """
+        return self.pack(msg)
+
     def unpack(self, msg: dict, buf: bytes) -> Tuple[dict, bytes]:
         """
         Require element objects to implement this function.
@@ -79,6 +79,15 @@ class ElementBase(Element):
             # recreate the struct with the new format
             self._struct = struct.Struct(self.format)
 
+    def raw_format(self):
+        """
+        Return the struct format of this element if it holds a single value
+        and needs no alignment padding.
+        """
+        if self._alignment == 1 and len(self._struct.unpack(bytes(self._struct.size))) == 1:
+            return self.format[1:]
+        return None
+
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
         data = self._struct.pack(msg[self.name])
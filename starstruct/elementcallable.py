@@ -79,10 +79,44 @@ Following creating this message, you have two options:
     assert made.item_b == 5
     assert made.function_data == 7
 
+3. Checksum the bytes of other elements.
+
+When a reference is given as bytes, the function is called with a
+``memoryview`` of the bytes that element occupies in the packed (or
+unpacked) message, so nothing is packed twice. To run a checksum over
+several elements, wrap the function with :py:class:`Incremental`, which
+feeds each span to the checksum in turn.
+
+.. code-block:: python
+
+    import hashlib
+    import zlib
+
+    FramedMessage = Message('FramedMessage', [
+        ('header', 'H'),
+        ('payload', ExampleMessage),
+        ('crc', 'I', Incremental(zlib.crc32), [b'header', b'payload']),
+        ('digest', '32s', Incremental(hashlib.sha256), [b'payload']),
+    ])
+
+Checks can also be deferred when unpacking, for instance when the data comes
+from storage that is already trusted. The checks are recorded with the spans
+they cover and can be verified later (or not at all):
+
+.. code-block:: python
+
+    checks = PendingChecks()
+    unpacked = [CRCedMessage.unpack(frame, checks=checks) for frame in frames]
+
+    # Raises ValueError if any of the recorded checks fail
+    checks.verify_batch(workers=4)
+
 """
 
-import copy
+import contextlib
 import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import Optional
 
@@ -90,6 +124,130 @@ from starstruct.element import register, Element
 from starstruct.modes import Mode
 
 
+class Incremental(object):
+    """
+    Wrap a running checksum so that it can be fed several buffers in turn.
+
+    Two kinds of checksum are supported:
+
+    - running value functions, such as ``zlib.crc32`` or ``zlib.adler32``,
+      that are called as ``func(data, value)``
+    - hash constructors, such as ``hashlib.sha256``, that return an object
+      with ``update()`` and ``digest()`` methods
+
+    :param func: The checksum function or hash constructor
+    """
+    def __init__(self, func):
+        self._func = func
+
+        try:
+            sample = func()
+        except TypeError:
+            sample = None
+        self._hash = hasattr(sample, 'update') and hasattr(sample, 'digest')
+
+    def __call__(self, *buffers):
+        if self._hash:
+            hasher = self._func()
+            for buf in buffers:
+                hasher.update(buf)
+            return hasher.digest()
+
+        if not buffers:
+            return self._func(b'')
+
+        value = self._func(buffers[0])
+        for buf in buffers[1:]:
+            value = self._func(buf, value)
+        return value
+
+    def __repr__(self):
+        return 'Incremental({})'.format(self._func)
+
+
+# The PendingChecks object (if any) that checks are being deferred to by the
+# unpack currently running in this thread
+_deferred = threading.local()
+
+
+class PendingChecks(object):
+    """
+    A collection of ElementCallable checks recorded during unpack.
+
+    Each check holds the element, the arguments (including memoryviews of the
+    spans it covers) and the unpacked value, so that it can be evaluated at
+    any later time.
+    """
+    def __init__(self):
+        self.checks = []
+
+    def __len__(self):
+        return len(self.checks)
+
+    def add(self, element, items, value):
+        """Record a check of ``element`` that was not evaluated inline"""
+        self.checks.append((element, items, value))
+
+    def clear(self):
+        """Forget all recorded checks, skipping them"""
+        self.checks = []
+
+    @staticmethod
+    def _evaluate(check):
+        (element, items, _) = check
+        return element._func_ref(*items)  # pylint: disable=protected-access
+
+    def verify_batch(self, workers: Optional[int]=None, executor=None):
+        """
+        Evaluate all recorded checks, and forget them once they pass.
+
+        :param workers: When given, evaluate the checks in a thread pool of
+            this many threads. Checksum functions such as ``zlib.crc32``
+            release the GIL on large buffers.
+        :param executor: An existing ``concurrent.futures`` executor to use
+            instead of creating a thread pool.
+        :raises ValueError: If any check does not match its unpacked value.
+        """
+        checks = self.checks
+        if executor is not None:
+            results = list(executor.map(self._evaluate, checks))
+        elif workers:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._evaluate, checks))
+        else:
+            results = [self._evaluate(check) for check in checks]
+
+        for (element, _, value), expected_value in zip(checks, results):
+            if expected_value != value:
+                raise ValueError('Expected value for {0} was: {1}, but got: {2}'.format(
+                    element.name,
+                    expected_value,
+                    value,
+                ))
+
+        self.checks = []
+
+
+@contextlib.contextmanager
+def deferred_checks(checks: Optional[PendingChecks]):
+    """
+    Record the checks of all ElementCallable elements unpacked within this
+    context in ``checks``, rather than evaluating them.
+
+    Passing ``None`` leaves the current behavior unchanged.
+    """
+    if checks is None:
+        yield
+        return
+
+    previous = getattr(_deferred, 'checks', None)
+    _deferred.checks = checks
+    try:
+        yield
+    finally:
+        _deferred.checks = previous
+
+
 @register
 class ElementCallable(Element):
     """
@@ -99,6 +257,8 @@ class ElementCallable(Element):
     :param mode: The mode in which to pack the bytes
     :param alignment: Number of bytes to align to
     """
+    uses_spans = True
+
     def __init__(self, field: list, mode: Optional[Mode]=Mode.Native, alignment: Optional[int]=1):
         # All of the type checks have already been performed by the class
         # factory
@@ -114,11 +274,20 @@ class ElementCallable(Element):
         else:
             self._error_on_bad_result = True
 
-        self.update(mode, alignment)
+        # Each reference is stored as (name, by_bytes) so the type of the
+        # reference doesn't have to be checked every time the function is called
+        self._references = []
+        for reference in self._func_args:
+            if isinstance(reference, str):
+                self._references.append((reference, False))
+            elif isinstance(reference, bytes):
+                self._references.append((reference.decode('utf-8'), True))
+            else:
+                raise ValueError('Needed str or bytes for the reference')
 
-    @property
-    def _struct(self):
-        return struct.Struct(self._mode.value + self.format)
+        self._mode = mode
+        self._alignment = alignment
+        self.update(mode, alignment)
 
     @staticmethod
     def valid(field: tuple) -> bool:
@@ -143,13 +312,9 @@ class ElementCallable(Element):
         # TODO: Validate the object
         self._elements = msg
 
-        if not all(k in msg
-                   for k in [arg if isinstance(arg, str) else arg.decode('utf-8')
-                             for arg in self._func_args]):
+        if not all(name in msg for name, _ in self._references):
             raise ValueError('Need all keys to be in the message')
 
-        pass
-
     def update(self, mode=None, alignment=None):
         """change the mode of the struct format"""
         if mode:
@@ -158,12 +323,39 @@ class ElementCallable(Element):
         if alignment:
             self._alignment = alignment
 
-    def pack(self, msg):
-        """Pack the provided values into the supplied buffer."""
-        return self._struct.pack(self.make(msg))
+        # recreate the struct with the new format
+        self._struct = struct.Struct(self._mode.value + self.format)
 
-    def unpack(self, msg, buf):
-        """Unpack data from the supplied buffer using the initialized format."""
+    def pack(self, msg, spans=None):
+        """
+        Pack the provided values into the supplied buffer.
+
+        :param msg: The values to pack
+        :param spans: The already packed bytes of the preceding elements,
+            keyed by element name
+        """
+        return self._struct.pack(self.make(msg, spans))
+
+    def pack_trusted(self, msg, spans=None):
+        """
+        Pack the value of a made (or unpacked) message as it is, without
+        calling the function again.  The function is only called if the value
+        is missing.
+        """
+        value = msg[self.name] if self.name in msg else None
+        if value is None:
+            return self.pack(msg, spans)
+        return self._struct.pack(value)
+
+    def unpack(self, msg, buf, spans=None):
+        """
+        Unpack data from the supplied buffer using the initialized format.
+
+        :param msg: The values unpacked thus far
+        :param buf: The remaining bytes to unpack
+        :param spans: The bytes consumed by each of the preceding elements,
+            keyed by element name
+        """
         ret = self._struct.unpack_from(buf)
         if isinstance(ret, (list, tuple)):
             # TODO: I don't know if there is a case where we want to keep
@@ -172,12 +364,12 @@ class ElementCallable(Element):
 
         # Only check for errors if they haven't told us not to
         if self._error_on_bad_result:
-            # Pretend we're getting a dictionary to make our item,
-            # but it has no reference to `self`. This is so we check
-            # for errors correctly.
-            temp_dict = copy.deepcopy(msg._asdict())
-            temp_dict.pop(self.name)
-            expected_value = self.make(temp_dict)
+            checks = getattr(_deferred, 'checks', None)
+            if checks is not None:
+                checks.add(self, self._expected_args(msg, spans), ret)
+                return (ret, buf[self._struct.size:])
+
+            expected_value = self.expected(msg, spans)
 
             # Check for an error
             if expected_value != ret:
@@ -188,7 +380,33 @@ class ElementCallable(Element):
 
         return (ret, buf[self._struct.size:])
 
-    def make(self, msg):
+    def expected(self, msg, spans=None):
+        """
+        Return the value the function produces for an unpacked message.
+
+        The referenced values in an unpacked message have already been made,
+        so they are passed to the function as-is, and referenced bytes are
+        taken from ``spans`` rather than being packed again.
+
+        :param msg: The unpacked (named tuple) message
+        :param spans: The bytes consumed by each element, keyed by name
+        """
+        return self._func_ref(*self._expected_args(msg, spans))
+
+    def _expected_args(self, msg, spans=None):
+        """Return the function arguments for an unpacked message"""
+        items = []
+        for name, by_bytes in self._references:
+            if not by_bytes:
+                items.append(getattr(msg, name))
+            elif spans is not None and name in spans:
+                items.append(spans[name])
+            else:
+                items.append(self._elements[name].pack(msg._asdict()))
+
+        return items
+
+    def make(self, msg, spans=None):
         """Return the expected "made" value"""
         # If we aren't going to error on a bad result
         # and our name is in the message, just send the value
@@ -199,20 +417,13 @@ class ElementCallable(Element):
             return msg[self.name]
 
         items = []
-
-        for reference in self._func_args:
-            if isinstance(reference, str):
-                index = reference
-                attr = 'make'
-            elif isinstance(reference, bytes):
-                index = reference.decode('utf-8')
-                attr = 'pack'
+        for name, by_bytes in self._references:
+            if not by_bytes:
+                items.append(self._elements[name].make(msg))
+            elif spans is not None and name in spans:
+                items.append(spans[name])
             else:
-                raise ValueError('Needed str or bytes for the reference')
-
-            items.append(
-                getattr(self._elements[index], attr)(msg)
-            )
+                items.append(self._elements[name].pack(msg))
 
         ret = self._func_ref(*items)
 
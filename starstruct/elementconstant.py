@@ -33,13 +33,9 @@ class ElementConstant(Element):
         self._mode = mode
         self._alignment = alignment
 
-    @property
-    def _struct(self):
-        return struct.Struct(self._mode.value + self.format)
-
-    @property
-    def _packed(self):
-        return self._struct.pack(*self.values)
+        # The constant never changes, so the struct and the packed bytes only
+        # need to be created when the mode changes.
+        self._compile()
 
     @staticmethod
     def valid(field: list) -> bool:
@@ -69,6 +65,13 @@ class ElementConstant(Element):
         if alignment:
             self._alignment = alignment
 
+        self._compile()
+
+    def _compile(self) -> None:
+        """Create the struct and the packed constant for the current mode"""
+        self._struct = struct.Struct(self._mode.value + self.format)
+        self._packed = self._struct.pack(*self.values)
+
     def pack(self, msg: dict) -> bytes:
         """
         Pack the provided values into the supplied buffer.
@@ -78,8 +81,22 @@ class ElementConstant(Element):
         return self._packed
 
     def unpack(self, msg: dict, buf: bytes) -> Tuple[bytes, bytes]:
-        """Unpack data from the supplied buffer using the initialized format."""
-        return (self._struct.unpack_from(buf), buf[self._struct.size:])
+        """
+        Unpack data from the supplied buffer using the initialized format.
+
+        The packed bytes are compared directly against the precomputed
+        constant, so no values need to be unpacked.
+        """
+        size = self._struct.size
+        if len(buf) < size:
+            raise struct.error('unpack requires a buffer of {} bytes for {}'.format(
+                size, self.name))
+
+        if buf[:size] != self._packed:
+            raise ValueError('Expected constant {0} for {1}, but got: {2}'.format(
+                self._packed, self.name, bytes(buf[:size])))
+
+        return (self.values, buf[size:])
 
     def make(self, msg: dict):
         """
@@ -1,10 +1,81 @@
-"""StarStruct element class."""
+"""
+StarStruct element class.
+
+Discriminated elements can optionally be given a payload class as a fourth
+item, to control what type the payload is unpacked as:
+
+.. code-block:: python
+
+    Envelope = Message('Envelope', [
+        ('type', 'H', MessageType),
+        ('payload', {
+            MessageType.status: StatusMessage,
+            MessageType.data: DataMessage,
+        }, 'type', LazyPayload),
+    ])
+
+:py:class:`LazyPayload` only finds the size of the payload when it is unpacked,
+and decodes it the first time one of its fields is accessed.  Packing an
+unmodified lazy payload reuses its original bytes.
+"""
 
 import starstruct
 from starstruct.element import register, Element
 from starstruct.modes import Mode
 
 
+class LazyPayload(object):
+    """
+    A discriminated payload that is decoded on first access.
+
+    :param message: The variant message of the payload
+    :param buf: The bytes of the payload
+    """
+    def __init__(self, message, buf):
+        self.message = message
+        self.buf = buf
+        self._value = None
+
+    @classmethod
+    def from_buffer(cls, message, buf):
+        """Create the payload for the bytes of a variant message"""
+        return cls(message, buf)
+
+    @property
+    def value(self):
+        """The decoded payload"""
+        if self._value is None:
+            self._value = self.message.unpack(self.buf)
+        return self._value
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not defined here, which are the
+        # fields (and methods) of the decoded payload
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __bytes__(self):
+        return bytes(self.buf)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __getitem__(self, index):
+        return self.value[index]
+
+    def __eq__(self, other):
+        if isinstance(other, LazyPayload):
+            other = other.value
+        return self.value == other
+
+    def __repr__(self):
+        return 'LazyPayload({}, {} bytes)'.format(self.message.name, len(self.buf))
+
+
 @register
 class ElementDiscriminated(Element):
     """
@@ -25,6 +96,16 @@ class ElementDiscriminated(Element):
         # object.
         self.format = field[1]
 
+        # An optional type to return the unpacked payload as
+        if len(field) == 4:
+            self.container = field[3]
+        else:
+            self.container = None
+
+        # A table from every form the discriminator can take to the message
+        # to use for it, this is completed once the enum is known in validate()
+        self.dispatch = dict(self.format)
+
         # but change the mode to match the current mode.
         self.update(mode, alignment)
 
@@ -37,11 +118,12 @@ class ElementDiscriminated(Element):
         The basics have already been validated by the Element factory class,
         validate that the struct format is a valid numeric value.
         """
-        return len(field) == 3 \
+        return len(field) in (3, 4) \
             and isinstance(field[1], dict) \
             and isinstance(field[2], str) \
             and all(isinstance(val, (starstruct.message.Message, type(None)))
-                    for val in field[1].values())
+                    for val in field[1].values()) \
+            and (len(field) == 3 or hasattr(field[3], 'from_buffer'))
 
     def validate(self, msg):
         """
@@ -70,6 +152,15 @@ class ElementDiscriminated(Element):
                     msg = err.format(self.name, key, self.ref)
                     raise TypeError(msg)
 
+            # The discriminator may be an enum member, its raw value (when
+            # raw enums are used, or when packing) or its name
+            self.dispatch = {}
+            for key, variant in self.format.items():
+                self.dispatch[key] = variant
+                self.dispatch[key.value] = variant
+            for key, variant in self.format.items():
+                self.dispatch.setdefault(key.name, variant)
+
     def update(self, mode=None, alignment=None):
         """change the mode of each message format"""
         self._mode = mode
@@ -84,23 +175,33 @@ class ElementDiscriminated(Element):
         # When packing use the value of the referenced element to determine
         # which field format to use to pack this element.  Be sure to check if
         # the referenced format is None or a Message object.
-        if msg[self.ref] not in self.format:
+        try:
+            variant = self.dispatch[msg[self.ref]]
+        except (KeyError, TypeError):
             msg = 'invalid value {} for element {}:{}'.format(
                 msg[self.ref], self.name, self.format.keys())
             raise ValueError(msg)
 
-        if self.format[msg[self.ref]] is not None:
-            if msg[self.name] is not None:
-                data = self.format[msg[self.ref]].pack(dict(msg[self.name]))
-            else:
-                data = self.format[msg[self.ref]].pack({})
-        else:
-            data = b''
-
         # There is no need to make sure that the packed data is properly
         # aligned, because that should already be done by the individual
         # messages that have been packed.
-        return data
+        payload = msg[self.name]
+        if variant is None:
+            return b''
+        elif payload is None:
+            return variant.pack({})
+        elif isinstance(payload, LazyPayload) and payload.message is variant:
+            # Forward the original bytes as they are
+            return payload.buf
+        return variant.pack(payload)
+
+    def pack_trusted(self, msg):
+        """Pack a made payload with the trusted packer of its variant"""
+        variant = self.dispatch.get(msg[self.ref])
+        payload = msg[self.name]
+        if variant is None or payload is None or isinstance(payload, LazyPayload):
+            return self.pack(msg)
+        return variant.pack_trusted(payload)
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
@@ -113,11 +214,16 @@ class ElementDiscriminated(Element):
         # properly aligned number of bytes because that should already be done
         # by the message that is unpacked.
         #
-        # Use the getattr() function since the referenced value is an enum
-        if self.format[getattr(msg, self.ref)] is not None:
-            return self.format[getattr(msg, self.ref)].unpack_partial(buf)
-        else:
+        # Use the getattr() function since the referenced value is an enum (or
+        # its raw value)
+        variant = self.dispatch[getattr(msg, self.ref)]
+        if variant is None:
             return (None, buf)
+        elif self.container is not None:
+            size = variant.measure(buf)
+            return (self.container.from_buffer(variant, buf[:size]), buf[size:])
+        else:
+            return variant.unpack_partial(buf)
 
     def make(self, msg):
         """Return the expected "made" value"""
@@ -127,7 +233,10 @@ class ElementDiscriminated(Element):
             # Assume it's a dictionary, not a tuple
             key = msg[self.ref]
 
-        if self.format[key] is not None:
-            return self.format[key].make(msg[self.name])
+        variant = self.dispatch[key]
+        if isinstance(msg[self.name], LazyPayload):
+            return msg[self.name]
+        elif variant is not None:
+            return variant.make(msg[self.name])
         else:
             return None
@@ -35,6 +35,11 @@ class ElementEnum(Element):
         self.format = mode.value + field[1]
         self._struct = struct.Struct(self.format)
 
+        # When raw is set the unpacked (and made) values are the raw values of
+        # the enum rather than enum members, see Message(raw_enums=True)
+        self.raw = False
+        self._values = frozenset(member.value for member in self.ref)
+
     @staticmethod
     def valid(field):
         """
@@ -94,6 +99,16 @@ class ElementEnum(Element):
             data += b'\x00' * missing_bytes
         return data
 
+    def pack_trusted(self, msg):
+        """Pack a made enum member (or raw value) directly"""
+        item = msg[self.name]
+        data = self._struct.pack(item if self.raw else item.value)
+
+        missing_bytes = len(data) % self._alignment
+        if missing_bytes:
+            data += b'\x00' * missing_bytes
+        return data
+
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
         ret = self._struct.unpack_from(buf, 0)
@@ -103,6 +118,16 @@ class ElementEnum(Element):
                                              self._alignment)
         unused = buf[struct.calcsize(self.format) + extra_bytes:]
 
+        # In raw mode only check the value is valid, without creating the
+        # enum member
+        if self.raw:
+            if ret[0] not in self._values:
+                raise ValueError(
+                    'Value: {0} was not valid for {1}\n\twith msg: {2},\n\tbuf: {3}'.format(
+                        ret[0], self.ref, msg, buf
+                    ))
+            return (ret[0], unused)
+
         # Convert the returned value to the referenced Enum type
         try:
             member = self.ref(ret[0])
@@ -129,4 +154,7 @@ class ElementEnum(Element):
                 raise ValueError(msg)
         else:
             enum_item = self.ref(item)
+
+        if self.raw:
+            return enum_item.value
         return enum_item
@@ -88,11 +88,18 @@ class ElementLength(Element):
             # When packing a length element, use the length of the referenced
             # element not the value of the current element in the supplied
             # object.
-            data = self._struct.pack(len(msg[self.ref]))
+            return self.pack_value(len(msg[self.ref]))
         else:
             # When packing something via byte length,
             # we use our self to determine the length
-            data = self._struct.pack(msg[self.name])
+            return self.pack_value(msg[self.name])
+
+    def pack_value(self, value):
+        """
+        Pack a length value, this is used directly when the length is not
+        known until the referenced element has been packed.
+        """
+        data = self._struct.pack(value)
 
         # If the data does not meet the alignment, add some padding
         missing_bytes = len(data) % self._alignment
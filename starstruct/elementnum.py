@@ -78,6 +78,15 @@ class ElementNum(Element):
             # recreate the struct with the new format
             self._struct = struct.Struct(self.format)
 
+    def raw_format(self):
+        """
+        Return the struct format of this element if it holds a single value
+        and needs no alignment padding.
+        """
+        if self._alignment == 1 and re.fullmatch(r'[bBhHiIlLqQ]', self.format[1:]):
+            return self.format[1:]
+        return None
+
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
         # Take a single numeric value and convert it into the necessary list
@@ -110,6 +119,12 @@ class ElementNum(Element):
             data += b'\x00' * missing_bytes
         return data
 
+    def pack_trusted(self, msg):
+        """Pack a made (integer) value directly"""
+        if self._alignment != 1 or self._struct.size != self._bytes:
+            return self.pack(msg)
+        return self._struct.pack(msg[self.name])
+
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
         ret = self._struct.unpack_from(buf, 0)
@@ -77,6 +77,12 @@ class ElementPad(Element):
             # recreate the struct with the new format
             self._struct = struct.Struct(self.format)
 
+    def raw_format(self):
+        """Padding has no value, so it can be unpacked with any struct"""
+        if self._alignment == 1:
+            return self.format[1:]
+        return None
+
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
         data = self._struct.pack()
@@ -105,6 +105,18 @@ class ElementString(Element):
             data += b'\x00' * missing_bytes
         return data
 
+    def pack_trusted(self, msg):
+        """Pack a made string directly"""
+        if self.format[-1] == 'c':
+            return self.pack(msg)
+        data = self._struct.pack(msg[self.name].encode())
+
+        # If the data does not meet the alignment, add some padding
+        missing_bytes = len(data) % self._alignment
+        if missing_bytes:
+            data += b'\x00' * missing_bytes
+        return data
+
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
         ret = self._struct.unpack_from(buf, 0)
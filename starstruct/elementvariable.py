@@ -47,6 +47,26 @@ Can be used in multiple ways ways:
     many messages in this message. You also no longer need to have another
     field that specifies the number of these messages.
 
+Repeated messages that are made only of plain struct values (numbers and
+padding) are unpacked in a single pass. For those messages a container class
+can also be given as a fourth item to control what type is returned instead of
+a list:
+
+    .. code-block:: python
+
+        Sample = Message('Sample', [('time', 'I'), ('value', 'h')])
+        message_struct = [
+            ('count', 'H', 'samples'),
+            ('samples', Sample, 'count', Columns),
+        ]
+
+    :py:class:`Columns` stores one ``array.array`` per field rather than one
+    named tuple per item, and builds named tuples only when items are accessed.
+
+    :py:class:`LazyRecords` keeps a view of the packed items and only unpacks
+    the items that are indexed, so reading the last few items of a large
+    section doesn't unpack all of the items before them.
+
 4: Fixed length, in terms of bytes?
     TODO: write this
     Might have something that can only fit a certain number of bytes, like a
@@ -54,15 +74,145 @@ Can be used in multiple ways ways:
 """
 # pylint: disable=line-too-long
 
+import array
+import collections.abc
 import struct
 
 from typing import Optional
 
 import starstruct
+import starstruct.limits
 from starstruct.element import register, Element
 from starstruct.modes import Mode
 
 
+# struct formats that can be stored in an array.array of the same typecode
+ARRAY_TYPECODES = 'bBhHiIlLqQfd'
+
+
+class Columns(object):
+    """
+    A column oriented container for repeated fixed size messages.
+
+    The values of each field are kept in an ``array.array`` (or a list when the
+    field's format has no array equivalent), and named tuples are only created
+    when items are indexed or iterated over.
+
+    :param message: The repeated message
+    :param columns: The values of each field in the message's tuple order
+    :param length: The number of items
+    """
+    def __init__(self, message, columns, length):
+        self.message = message
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_buffer(cls, message, buf, count):
+        """
+        Unpack ``count`` items from a buffer holding exactly that many.
+
+        :param message: A message with a fixed size struct
+        :param buf: The bytes of the repeated items
+        :param count: The number of items in buf
+        """
+        # pylint: disable=protected-access
+        formats = [elem.raw_format()[-1] for elem in message._elements.values() if elem.name]
+        if count:
+            values = zip(*message._fixed.iter_unpack(buf))
+        else:
+            values = [[] for _ in formats]
+
+        columns = [array.array(fmt, col) if fmt in ARRAY_TYPECODES else list(col)
+                   for fmt, col in zip(formats, values)]
+        return cls(message, columns, count)
+
+    def column(self, name):
+        """Return all of the values of one field"""
+        return self._columns[self.message._tuple._fields.index(name)]  # pylint: disable=protected-access
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = [col[index] for col in self._columns]
+            return Columns(self.message, columns, len(range(*index.indices(self._length))))
+
+        return self.message._tuple._make([col[index] for col in self._columns])  # pylint: disable=protected-access
+
+    def __iter__(self):
+        return map(self.message._tuple._make, zip(*self._columns))  # pylint: disable=protected-access
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'Columns({}, {})'.format(self.message.name, list(self))
+
+
+class LazyRecords(collections.abc.Sequence):
+    """
+    A read-only sequence of repeated fixed size messages that are unpacked on
+    access.
+
+    Item ``i`` is unpacked directly from offset ``i * size`` of the packed
+    items, and neither ``len()`` nor slicing unpack anything.  The sequence
+    holds a view of the buffer it was unpacked from.
+
+    :param message: The repeated message
+    :param buf: The bytes of the repeated items
+    :param length: The number of items
+    """
+    def __init__(self, message, buf, length):
+        self.message = message
+        self._buf = memoryview(buf)
+        self._length = length
+        self._struct = message._fixed  # pylint: disable=protected-access
+
+    @classmethod
+    def from_buffer(cls, message, buf, count):
+        """
+        Create the sequence for ``count`` items in a buffer holding exactly
+        that many.
+        """
+        return cls(message, buf, count)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        size = self._struct.size
+        if isinstance(index, slice):
+            (start, stop, step) = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            stop = max(start, stop)
+            return LazyRecords(self.message, self._buf[start * size:stop * size], stop - start)
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('{} index out of range'.format(self.message.name))
+
+        return self.message._tuple._make(self._struct.unpack_from(self._buf, index * size))  # pylint: disable=protected-access
+
+    def __iter__(self):
+        return map(self.message._tuple._make, self._struct.iter_unpack(self._buf))  # pylint: disable=protected-access
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'LazyRecords({}, {} items)'.format(self.message.name, self._length)
+
+
 @register
 class ElementVariable(Element):
     """
@@ -89,6 +239,12 @@ class ElementVariable(Element):
         # current mode.
         self.format = field[1]
 
+        # An optional container type to return the unpacked items in
+        if len(field) == 4:
+            self.container = field[3]
+        else:
+            self.container = None
+
         # Set the packing style for the struct
         if isinstance(self.ref, (str, bytes)):
             self.variable_repeat = True
@@ -121,6 +277,10 @@ class ElementVariable(Element):
         elif len(field) == 3:
             return isinstance(field[1], starstruct.message.Message) \
                 and isinstance(field[2], (str, int, bytes))
+        elif len(field) == 4:
+            return isinstance(field[1], starstruct.message.Message) \
+                and isinstance(field[2], (str, int, bytes)) \
+                and hasattr(field[3], 'from_buffer')
         else:
             return False
 
@@ -150,6 +310,11 @@ class ElementVariable(Element):
                 err = 'fixed repetition field {} reference {} not an integer'
                 raise TypeError(err.format(self.name, self.ref))
 
+        if self.container is not None:
+            if self.format._fixed is None:  # pylint: disable=protected-access
+                err = 'variable field {} container requires a fixed size message'
+                raise TypeError(err.format(self.name))
+
     def update(self, mode=None, alignment=None):
         """change the mode of the struct format"""
         self._mode = mode
@@ -163,19 +328,19 @@ class ElementVariable(Element):
         # (which should not be specified manually).
         iterator = msg[self.name]
 
-        if not isinstance(iterator, list):
+        if iterator is None or isinstance(iterator, dict) or hasattr(iterator, '_asdict'):
             iterator = [iterator]
 
         if self.variable_repeat:
             if self.object_length:
-                ret = [self.format.pack(dict(elem)) if elem else self.format.pack({})
+                ret = [self.format.pack(elem) if elem else self.format.pack({})
                        for elem in iterator]
             else:
                 ret = []
                 length = 0
 
                 for elem in iterator:
-                    temp_elem = self.format.pack(dict(elem))
+                    temp_elem = self.format.pack(elem)
 
                     if length + len(temp_elem) <= msg[self.ref]:
                         ret.append(temp_elem)
@@ -192,6 +357,36 @@ class ElementVariable(Element):
         # messages that have been packed.
         return b''.join(ret)
 
+    def pack_trusted(self, msg):
+        """Pack made items with the trusted packer of the item message"""
+        if not (self.variable_repeat and self.object_length):
+            return self.pack(msg)
+
+        iterator = msg[self.name]
+        if iterator is None or isinstance(iterator, dict) or hasattr(iterator, '_asdict'):
+            iterator = [iterator]
+
+        pack = self.format.pack_trusted
+        return b''.join([pack(elem) if elem else self.format.pack({}) for elem in iterator])
+
+    def pack_chunks(self, msg):
+        """
+        Yield the packed bytes of each item in turn.
+
+        Unlike :py:meth:`pack` the items can be supplied by any iterator, such
+        as a generator, so the items never need to be held in memory at once.
+        """
+        if not self.variable_repeat:
+            yield self.pack(msg)
+            return
+
+        iterator = msg[self.name]
+        if iterator is None or isinstance(iterator, dict) or hasattr(iterator, '_asdict'):
+            iterator = [iterator]
+
+        for elem in iterator:
+            yield self.format.pack(elem) if elem else self.format.pack({})
+
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
         # When unpacking a variable element, reference the already unpacked
@@ -204,15 +399,69 @@ class ElementVariable(Element):
             else:
                 msg_range = self.ref
 
-            for _ in range(msg_range):
-                (val, unused) = self.format.unpack_partial(unused)
-                ret.append(val)
+            # Reject impossible or excessive counts before unpacking anything
+            limits = starstruct.limits.current()
+            limits.check_items(self.name, msg_range, len(unused), self.format._min_size)  # pylint: disable=protected-access
+
+            fixed = self.format._fixed  # pylint: disable=protected-access
+            if fixed is not None:
+                # The items are a level deeper even though they are not
+                # unpacked through unpack_partial
+                limits.check_depth(self.format.name, starstruct.limits.current_depth() + 1)
+
+                # Unpack all of the items in one pass
+                size = fixed.size * msg_range
+                if len(unused) < size:
+                    err = 'unpack of {} requires a buffer of {} bytes'
+                    raise struct.error(err.format(self.name, size))
+
+                if self.container is not None:
+                    ret = self.container.from_buffer(self.format, unused[:size], msg_range)
+                else:
+                    ret = list(map(self.format._tuple._make,  # pylint: disable=protected-access
+                                   fixed.iter_unpack(unused[:size])))
+                unused = unused[size:]
+            else:
+                for _ in range(msg_range):
+                    (val, unused) = self.format.unpack_partial(unused)
+                    ret.append(val)
         else:
-            length = 0
-            while length < getattr(msg, self.ref):
-                (val, unused) = self.format.unpack_partial(unused)
-                length += len(val)
-                ret.append(val)
+            # Only unpack items from a window of exactly the referenced number
+            # of bytes, so a bad length can never consume more than that.
+            size = getattr(msg, self.ref)
+            if len(unused) < size:
+                err = 'unpack of {} requires a buffer of {} bytes'
+                raise struct.error(err.format(self.name, size))
+            window = memoryview(unused)[:size]
+
+            limits = starstruct.limits.current()
+            fixed = self.format._fixed  # pylint: disable=protected-access
+            if fixed is not None:
+                limits.check_depth(self.format.name, starstruct.limits.current_depth() + 1)
+
+                (count, extra) = divmod(size, fixed.size)
+                if extra:
+                    err = 'byte length {} of {} is not a multiple of {}'
+                    raise ValueError(err.format(size, self.name, fixed.size))
+                limits.check_items(self.name, count, size, fixed.size)
+
+                if self.container is not None:
+                    ret = self.container.from_buffer(self.format, window, count)
+                else:
+                    ret = list(map(self.format._tuple._make,  # pylint: disable=protected-access
+                                   fixed.iter_unpack(window)))
+            else:
+                offset = 0
+                while offset < size:
+                    limits.check_items(self.name, len(ret) + 1, size, self.format._min_size)  # pylint: disable=protected-access
+                    (val, remaining) = self.format.unpack_partial(window[offset:])
+                    if len(remaining) == size - offset:
+                        err = 'variable field {} item consumed no bytes'
+                        raise ValueError(err.format(self.name))
+                    offset = size - len(remaining)
+                    ret.append(val)
+
+            unused = unused[size:]
 
         # There is no need to make sure that the unpacked data consumes a
         # properly aligned number of bytes because that should already be done
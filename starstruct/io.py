@@ -0,0 +1,244 @@
+"""
+Read files of packed records.
+
+.. code-block:: python
+
+    with RecordFile('capture.bin', Sample) as records:
+        print(len(records), records[-1])
+
+        for record in records:
+            ...
+
+The file is memory mapped, so records are unpacked straight from the mapping
+and the file is never read into memory as a whole.
+
+Files of variable size records can be indexed, which allows ``len()`` and
+indexing just like fixed size records:
+
+.. code-block:: python
+
+    with RecordFile('capture.bin', Frame, index=True) as records:
+        print(len(records), records[-1])
+
+The index is saved next to the file (as ``capture.bin.idx``) and is reused,
+or extended if records have been appended to the file since.
+"""
+
+import array
+import mmap
+import os
+import struct
+import sys
+
+from starstruct.message import Message
+
+
+# magic, version, schema fingerprint, indexed size of the file, record count
+INDEX_HEADER = struct.Struct('<4sB20sQQ')
+INDEX_MAGIC = b'SSIX'
+INDEX_VERSION = 1
+
+
+class OffsetIndex(object):
+    """
+    The offset of each record in a file of variable size records.
+
+    :param fingerprint: The fingerprint of the message of the records
+    :param offsets: An ``array('Q')`` of record offsets
+    :param end: The offset just past the last indexed record
+    """
+    def __init__(self, fingerprint: bytes, offsets: array.array=None, end: int=0):
+        self.fingerprint = fingerprint
+        self.offsets = offsets if offsets is not None else array.array('Q')
+        self.end = end
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        return self.offsets[index]
+
+    def extend(self, buf, message: Message) -> None:
+        """
+        Index any records in the buffer after those already indexed.  Only the
+        size of each record is found, the records are not unpacked.  A
+        partially written record at the end of the buffer is not indexed.
+        """
+        view = memoryview(buf)
+        offset = self.end
+        try:
+            while offset < len(view):
+                size = message.measure(view[offset:])
+                if not size:
+                    raise ValueError('{} records of 0 bytes can not be indexed'.format(message.name))
+                self.offsets.append(offset)
+                offset += size
+        except struct.error:
+            pass
+        finally:
+            view.release()
+        self.end = offset
+
+    @classmethod
+    def load(cls, path, fingerprint: bytes, size: int):
+        """
+        Load an index file, returns None if the file is missing, was made for
+        a different message, or is for a larger file than the current one.
+        """
+        try:
+            with open(path, 'rb') as index_file:
+                header = index_file.read(INDEX_HEADER.size)
+                (magic, version, index_fingerprint, end, count) = INDEX_HEADER.unpack(header)
+                if magic != INDEX_MAGIC or version != INDEX_VERSION \
+                        or index_fingerprint != fingerprint or end > size:
+                    return None
+
+                offsets = array.array('Q')
+                offsets.fromfile(index_file, count)
+        except (OSError, EOFError, struct.error):
+            return None
+
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        return cls(fingerprint, offsets, end)
+
+    def save(self, path) -> None:
+        """Save the index to a file"""
+        offsets = self.offsets
+        if sys.byteorder != 'little':
+            offsets = array.array('Q', offsets)
+            offsets.byteswap()
+
+        with open(path, 'wb') as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.fingerprint,
+                                               self.end, len(offsets)))
+            offsets.tofile(index_file)
+
+
+class RecordFile(object):
+    """
+    A memory mapped file of consecutive packed records.
+
+    Iterating over the file unpacks one record at a time.  When the message is
+    a fixed size, ``len()`` and indexing are also supported, without
+    unpacking any other records.
+
+    Any lazily unpacked values (such as LazyRecords or LazyPayload) refer to
+    the mapping, and must be released before the file is closed.
+
+    :param path: The path of the file
+    :param message: The message of each record
+    :param index: Whether to index variable size records, see
+        :py:meth:`load_index`
+    """
+    def __init__(self, path, message: Message, index: bool=False):
+        self.path = path
+        self.message = message
+
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self._mmap = None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b'')
+
+        self._struct = message._fixed  # pylint: disable=protected-access
+
+        self.index = None
+        if index and self._struct is None:
+            self.load_index()
+
+    @property
+    def index_path(self):
+        """The path of the index file"""
+        return str(self.path) + '.idx'
+
+    def load_index(self, save: bool=True) -> OffsetIndex:
+        """
+        Load the index of the records, building or extending it as needed.
+
+        :param save: Whether to save the index file if it changed
+        """
+        fingerprint = self.message.fingerprint()
+        index = OffsetIndex.load(self.index_path, fingerprint, len(self._view))
+        if index is None:
+            index = OffsetIndex(fingerprint)
+
+        end = index.end
+        index.extend(self._view, self.message)
+        if save and (index.end != end or not os.path.exists(self.index_path)):
+            index.save(self.index_path)
+
+        self.index = index
+        return index
+
+    @property
+    def size(self) -> int:
+        """The size of the file in bytes"""
+        return len(self._view)
+
+    def close(self) -> None:
+        """Close the mapping and the file"""
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def offsets(self):
+        """Yield the offset of each record in turn"""
+        if self._struct is not None:
+            return iter(range(0, len(self) * self._struct.size, self._struct.size))
+        elif self.index is not None:
+            return iter(self.index.offsets)
+        return self._walk()
+
+    def _walk(self):
+        offset = 0
+        size = len(self._view)
+        while offset < size:
+            yield offset
+            offset += self.message.measure(self._view[offset:])
+
+    def __iter__(self):
+        if self._struct is not None:
+            view = self._view[:len(self) * self._struct.size]
+            return map(self.message._tuple._make, self._struct.iter_unpack(view))  # pylint: disable=protected-access
+        return self._records()
+
+    def _records(self):
+        offset = 0
+        size = len(self._view)
+        while offset < size:
+            (msg, unused) = self.message.unpack_partial(self._view[offset:])
+            offset = size - len(unused)
+            yield msg
+
+    def __len__(self):
+        if self.index is not None:
+            return len(self.index)
+        elif self._struct is None:
+            raise TypeError('len() of {} requires fixed size records or an index'.format(self.path))
+
+        # Any partially written record at the end of the file is ignored
+        return len(self._view) // self._struct.size
+
+    def __getitem__(self, index: int):
+        if self._struct is None and self.index is None:
+            raise TypeError('indexing {} requires fixed size records or an index'.format(self.path))
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('record index out of range')
+
+        if self.index is not None:
+            return self.message.unpack_from(self._view, self.index[index])
+        return self.message.unpack_from(self._view, index * self._struct.size)
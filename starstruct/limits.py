@@ -0,0 +1,108 @@
+"""
+Limits on the resources used when unpacking untrusted data.
+
+Length elements read from a buffer control how many items are unpacked, so a
+malformed or hostile buffer can claim far more items than it could possibly
+hold.  These limits allow such buffers to be rejected before any work is done.
+
+Limits can be set globally:
+
+.. code-block:: python
+
+    import starstruct.limits
+
+    starstruct.limits.set_defaults(max_items=10000, max_bytes=2 ** 20, max_depth=8)
+
+or for a single message, in which case they apply to everything unpacked as
+part of that message:
+
+.. code-block:: python
+
+    Frame = Message('Frame', fields, limits=Limits(max_items=4096))
+"""
+
+import struct
+import threading
+
+from typing import Optional
+
+
+class LimitError(ValueError):
+    """Raised when unpacking a buffer would exceed a decode limit."""
+    pass
+
+
+class Limits(object):
+    """
+    The decode limits for a message.
+
+    :param max_items: The maximum number of items in any variable element
+    :param max_bytes: The maximum size of a message to unpack (any data after
+        the message in the buffer is not counted)
+    :param max_depth: The maximum nesting depth of messages
+    """
+    def __init__(self, max_items: Optional[int]=None, max_bytes: Optional[int]=None,
+                 max_depth: Optional[int]=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_depth = max_depth
+
+    def __repr__(self):
+        return 'Limits(max_items={}, max_bytes={}, max_depth={})'.format(
+            self.max_items, self.max_bytes, self.max_depth)
+
+    def check_bytes(self, name: str, size: int) -> None:
+        """Ensure a buffer is not too large to unpack"""
+        if self.max_bytes is not None and size > self.max_bytes:
+            err = '{} buffer of {} bytes exceeds the limit of {} bytes'
+            raise LimitError(err.format(name, size, self.max_bytes))
+
+    def check_depth(self, name: str, depth: int) -> None:
+        """Ensure messages are not nested too deeply"""
+        if self.max_depth is not None and depth > self.max_depth:
+            err = '{} nested {} deep exceeds the limit of {}'
+            raise LimitError(err.format(name, depth, self.max_depth))
+
+    def check_items(self, name: str, count: int, available: int, min_size: int) -> None:
+        """
+        Ensure that a number of items is allowed, and could possibly fit in the
+        remaining bytes.
+
+        :param name: The name of the variable element
+        :param count: The number of items the buffer claims
+        :param available: The number of bytes remaining in the buffer
+        :param min_size: The minimum number of bytes each item uses
+        """
+        if self.max_items is not None and count > self.max_items:
+            err = '{} count of {} exceeds the limit of {} items'
+            raise LimitError(err.format(name, count, self.max_items))
+
+        # This is the same error the struct module gives for a short buffer
+        if count * min_size > available:
+            err = '{} count of {} needs at least {} bytes, only {} remain'
+            raise struct.error(err.format(name, count, count * min_size, available))
+
+
+# The limits used by messages that don't have their own
+DEFAULT = Limits()
+
+# The limits and nesting depth of the unpack running in this thread
+_state = threading.local()
+
+
+def set_defaults(max_items: Optional[int]=None, max_bytes: Optional[int]=None,
+                 max_depth: Optional[int]=None) -> None:
+    """Set the limits used by messages that don't have their own"""
+    DEFAULT.max_items = max_items
+    DEFAULT.max_bytes = max_bytes
+    DEFAULT.max_depth = max_depth
+
+
+def current() -> Limits:
+    """Return the limits that apply to the unpack running in this thread"""
+    return getattr(_state, 'limits', None) or DEFAULT
+
+
+def current_depth() -> int:
+    """Return the nesting depth of the unpack running in this thread"""
+    return getattr(_state, 'depth', 0)
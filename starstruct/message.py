@@ -1,19 +1,102 @@
 """StarStruct class."""
 
+# pylint: disable=too-many-lines
+
 import collections
+import collections.abc
+import copy
+import enum
+import gc
+import hashlib
 
 import struct
+import types
+import weakref
+import starstruct.limits
 import starstruct.modes
-from starstruct.element import Element
+from starstruct.cache import LRUCache, buffer_key, freeze, immutable
+from starstruct.element import Element, TupleFields
+from starstruct.elementcallable import Incremental, deferred_checks
+from starstruct.overlay import overlay_class
+from starstruct.template import Template
 from starstruct.startuple import StarTuple
 
 
-# pylint: disable=line-too-long
+# Every message by fingerprint, so that pickled messages and records can be
+# matched to the messages already defined in the process that unpickles them
+# (several messages can have the same fingerprint, any of them will do)
+_registry = collections.defaultdict(weakref.WeakSet)
+
+
+def _registered(fingerprint):
+    """
+    Return the defined message with a fingerprint.
+
+    :raises KeyError: If no message has the fingerprint
+    :raises ValueError: If several messages have the fingerprint
+    """
+    messages = list(_registry.get(fingerprint, ()))
+    if len(messages) > 1:
+        # Messages refer to their tuples and back, so messages that are no
+        # longer used stay registered until they are collected
+        del messages
+        gc.collect()
+        messages = list(_registry.get(fingerprint, ()))
+
+    if not messages:
+        raise KeyError(fingerprint)
+    if len(messages) > 1:
+        raise ValueError('fingerprint {} matches {} messages: {}'.format(
+            fingerprint.hex(), len(messages), ', '.join(message.name for message in messages)))
+    return messages[0]
+
+
+def _lookup(fingerprint, name):
+    """Find the message a pickled message refers to"""
+    try:
+        return _registered(fingerprint)
+    except KeyError:
+        raise KeyError('message {} ({}) is not defined, pickle its portable() form first'.format(
+            name, fingerprint.hex())) from None
+
+
+def _restore(fingerprint, name, fields, mode, alignment, limits, raw_enums):  # pylint: disable=too-many-arguments
+    """Find (or create) the message a pickled definition refers to"""
+    try:
+        return _registered(fingerprint)
+    except KeyError:
+        return Message(name, fields, mode, alignment, limits, raw_enums)
+
+
+def _unpack_record(fingerprint, name, data):
+    """Unpack a pickled record"""
+    return _lookup(fingerprint, name).unpack(data)
+
+
+class PortableMessage(object):
+    """
+    Pickles a message with all of its fields, see :py:meth:`Message.portable`.
+    Unpickling it gives the message itself.
+
+    :param message: The message to pickle
+    """
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        self.message = message
+
+    def __reduce__(self):
+        message = self.message
+        return (_restore, (message._fingerprint, message.name, message._definition, message.mode,  # pylint: disable=protected-access
+                           message.alignment, message.limits, message.raw_enums))
+
+
+# pylint: disable=line-too-long,too-many-instance-attributes
 class Message(object):
     """An object much like NamedTuple, but with additional formatting."""
 
-    # pylint: disable=too-many-branches
-    def __init__(self, name, fields, mode=starstruct.modes.Mode.Native, alignment=1):
+    # pylint: disable=too-many-branches,too-many-arguments
+    def __init__(self, name, fields, mode=starstruct.modes.Mode.Native, alignment=1, limits=None, raw_enums=False, pack_cache=0, unpack_cache=0, trusted=False):
         """
         Initialize a StarStruct object.
 
@@ -21,6 +104,19 @@ class Message(object):
         struct module functions for packing and unpacking data, and a
         namedtuple instance which is used to organize the data provided to the
         pack functions and returned from the unpack functions.
+
+        The optional limits (a :py:class:`starstruct.limits.Limits` object)
+        apply when this message is unpacked, instead of the default limits.
+
+        When raw_enums is set, enum elements of this message are unpacked (and
+        made) as their raw values rather than as enum members.
+
+        When pack_cache is set, the bytes packed for that many distinct values
+        are cached, see :py:meth:`set_pack_cache`.  Likewise when unpack_cache
+        is set, see :py:meth:`set_unpack_cache`.
+
+        When trusted is set, :py:meth:`pack` always behaves like
+        :py:meth:`pack_trusted`.
         """
 
         # The name must be a string, this is provided to the
@@ -31,6 +127,9 @@ class Message(object):
         self.name = name
         self.mode = mode
         self.alignment = alignment
+        self.limits = limits
+        self.trusted = trusted
+        self._definition = fields
 
         # The structure definition must be a list of
         #   ('name', 'format', <optional>)
@@ -57,6 +156,12 @@ class Message(object):
             else:
                 raise TypeError('duplicate field {} in {}'.format(field[0], fields))
 
+        self.raw_enums = raw_enums
+        if raw_enums:
+            for elem in self._elements.values():
+                if hasattr(elem, 'raw'):
+                    elem.raw = True
+
         # Validate all of the elements of this message
         for elem in self._elements.values():
             elem.validate(self._elements)
@@ -64,17 +169,204 @@ class Message(object):
         # Now that the format has been validated, create a named tuple with the
         # correct fields.
         named_fields = [elem.name for elem in self._elements.values() if elem.name]
-        self._tuple = StarTuple(self.name, named_fields, self._elements)
+        self._tuple = StarTuple(self.name, named_fields, self._elements, self)
+        self._index = {name: index for index, name in enumerate(named_fields)}
+
+        # The elements whose values determine the size of other elements
+        self._referenced = {elem.ref for elem in self._elements.values()
+                            if isinstance(elem.format, (Message, dict)) and isinstance(elem.ref, str)}
+
+        # The messages nested in this one compile it again when they change
+        self._parents = weakref.WeakSet()
+        for elem in self._elements.values():
+            nested = elem.format.values() if isinstance(elem.format, dict) else [elem.format]
+            for message in nested:
+                if isinstance(message, Message):
+                    message._parents.add(self)  # pylint: disable=protected-access
+
+        # Incremented whenever this message is compiled, so that the bytes a
+        # record was packed into are not reused once its message is updated
+        self._generation = 0
+        self._fingerprint = None
+        self.pack_cache = None
+        self.unpack_cache = None
+        self._compile()
+
+        if pack_cache:
+            self.set_pack_cache(pack_cache)
+        if unpack_cache:
+            self.set_unpack_cache(unpack_cache)
+
+    def _compile(self):
+        """
+        If every element of this message is a plain struct value, create a
+        single struct that can unpack the entire message at once.
+        """
+        # Whether any element needs the bytes of the other elements
+        self._uses_spans = any(elem.uses_spans for elem in self._elements.values())
+
+        formats = [elem.raw_format() for elem in self._elements.values()]
+        if formats and all(fmt is not None for fmt in formats):
+            self._fixed = struct.Struct(self.mode.value + ''.join(formats))
+            if not self._fixed.size:
+                self._fixed = None
+        else:
+            self._fixed = None
+
+        # The smallest number of bytes this message can be packed into, used
+        # to reject impossible item counts before unpacking anything
+        self._min_size = 0
+        for elem in self._elements.values():
+            if isinstance(elem.format, Message):
+                if not elem.variable_repeat:
+                    self._min_size += elem.ref * elem.format._min_size  # pylint: disable=protected-access
+            elif isinstance(elem.format, dict):
+                sizes = [0 if msg is None else msg._min_size for msg in elem.format.values()]  # pylint: disable=protected-access
+                self._min_size += min(sizes, default=0)
+            else:
+                self._min_size += elem._struct.size  # pylint: disable=protected-access
+
+        # The offset of each named element that is at the same offset in every
+        # packed message (those before any variable element), and the size of
+        # messages without any variable elements
+        self._offsets = collections.OrderedDict()
+        self._size = None
+        if self.alignment == 1:
+            offset = 0
+            for elem in self._elements.values():
+                if isinstance(elem.format, (Message, dict)):
+                    break
+                if elem.name:
+                    self._offsets[elem.name] = (offset, elem)
+                offset += elem._struct.size  # pylint: disable=protected-access
+            else:
+                self._size = offset
+        self._overlay = None
+
+        self._generation += 1
+        if self.pack_cache is not None:
+            self.pack_cache.clear()
+        if self.unpack_cache is not None:
+            self.unpack_cache.clear()
+
+        fingerprint = self.fingerprint()
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            _registry[self._fingerprint].discard(self)
+        self._fingerprint = fingerprint
+        _registry[fingerprint].add(self)
+
+        # The sizes and fingerprints of the messages this one is nested in
+        # depend on it
+        for parent in list(self._parents):
+            parent._compile()  # pylint: disable=protected-access
 
     def update(self, mode=None, alignment=None):
         """ Change the mode of a message. """
         if mode and not isinstance(mode, starstruct.modes.Mode):
             raise TypeError('invalid mode: {}'.format(mode))
 
+        if mode:
+            self.mode = mode
+        if alignment:
+            self.alignment = alignment
+
         # Change the mode for all elements
         for key in self._elements.keys():
             self._elements[key].update(mode, alignment)
 
+        self._compile()
+
+    def set_pack_cache(self, maxsize):
+        """
+        Cache the bytes packed for the most recently used distinct values,
+        see :py:mod:`starstruct.cache`.  The cache is cleared whenever the
+        message is updated.
+
+        Only messages whose packed bytes depend on nothing but the values
+        packed can be cached.  Callable elements that don't refer to any other
+        elements (such as timestamps) are assumed to depend on something else.
+
+        :param maxsize: The maximum number of cached values, or 0 to disable
+            the cache
+        :raises ValueError: If the message (or a message it contains) has a
+            callable element that doesn't refer to other elements
+        """
+        if not maxsize:
+            self.pack_cache = None
+            return
+
+        for elem in self._all_elements():
+            if elem.uses_spans and not elem._references:  # pylint: disable=protected-access
+                raise ValueError('{} can not be cached, {} depends on more than the packed values'.format(
+                    self.name, elem.name))
+        self.pack_cache = LRUCache(maxsize)
+
+    def set_unpack_cache(self, maxsize):
+        """
+        Cache the records unpacked from the most recently used distinct
+        buffers, see :py:mod:`starstruct.cache`.  The cache is cleared whenever
+        the message is updated.
+
+        While the cache is enabled every list in an unpacked record is
+        converted to a tuple, since the same record is returned for every
+        buffer with the same bytes.
+
+        :param maxsize: The maximum number of cached records, or 0 to disable
+            the cache
+        """
+        self.unpack_cache = LRUCache(maxsize) if maxsize else None
+
+    def _all_elements(self):
+        """Yield every element of this message and the messages it contains"""
+        for elem in self._elements.values():
+            yield elem
+            if isinstance(elem.format, Message):
+                yield from elem.format._all_elements()  # pylint: disable=protected-access
+            elif isinstance(elem.format, dict):
+                for variant in elem.format.values():
+                    if variant is not None:
+                        yield from variant._all_elements()  # pylint: disable=protected-access
+
+    def __reduce__(self):
+        """
+        Pickle a message by its fingerprint.  When unpickled, the message with
+        the same fingerprint must already be defined, see :py:meth:`portable`
+        to pickle the fields of the message too.
+        """
+        return (_lookup, (self._fingerprint, self.name))
+
+    def __deepcopy__(self, memo):
+        """Create an independent message with copies of the same fields"""
+        pack_cache = self.pack_cache.maxsize if self.pack_cache is not None else 0
+        unpack_cache = self.unpack_cache.maxsize if self.unpack_cache is not None else 0
+        return Message(self.name, copy.deepcopy(self._definition, memo), self.mode, self.alignment,
+                       self.limits, self.raw_enums, pack_cache, unpack_cache, self.trusted)
+
+    def portable(self):
+        """
+        Return an object that pickles this message with all of its fields, so
+        that it can be unpickled by a process that hasn't defined the message.
+        Any functions or enums used by the fields must be importable.
+
+        .. code-block:: python
+
+            data = pickle.dumps(Status.portable())
+
+            # In another process
+            Status = pickle.loads(data)
+        """
+        return PortableMessage(self)
+
+    @staticmethod
+    def lookup(fingerprint):
+        """
+        Return the message with a fingerprint.
+
+        :raises KeyError: If no message with the fingerprint is defined
+        :raises ValueError: If several messages with the fingerprint are defined
+        """
+        return _registered(fingerprint)
+
     def is_unpacked(self, other):
         """
         Provide a function that allows checking if an unpacked message tuple
@@ -104,43 +396,540 @@ class Message(object):
                 # Select the correct message object based on the value of the
                 # referenced item
                 ref_val = getattr(other, self._elements[key].ref)
-                if ref_val not in self._elements[key].format.keys():
+                dispatch = self._elements[key].dispatch
+                if ref_val not in dispatch:
                     return False
-                msg = self._elements[key].format[ref_val]
-                if not msg.is_unpacked(getattr(other, key)):
+                msg = dispatch[ref_val]
+                if msg is not None and not msg.is_unpacked(getattr(other, key)):
                     return False
         return True
 
     def pack(self, obj=None, **kwargs):
-        """Pack the provided values using the initialized format."""
+        """
+        Pack the provided values using the initialized format.
+
+        The values can be a dictionary (or keyword arguments), or a tuple (such
+        as an unpacked StarTuple) or any other sequence of values in field
+        order.
+        """
+        kwargs = self._values(obj, kwargs)
+
+        cache = self.pack_cache
+        if cache is not None:
+            try:
+                key = freeze(kwargs)
+                data = cache.get(key)
+            except TypeError:
+                # Values that can't be hashed are simply not cached
+                cache = None
+            else:
+                if data is not None:
+                    return data
+
+        if self.trusted:
+            data = self._pack_trusted(kwargs)
+        elif not self._uses_spans:
+            data = b''.join([elem.pack(kwargs) for elem in self._elements.values()])
+        else:
+            # Keep track of the bytes each element has packed, so that elements
+            # which operate on other elements' bytes (such as checksums) don't
+            # have to pack them again.
+            parts = []
+            spans = {}
+            for elem in self._elements.values():
+                if elem.uses_spans:
+                    data = elem.pack(kwargs, spans)
+                else:
+                    data = elem.pack(kwargs)
+                if elem.name:
+                    spans[elem.name] = memoryview(data)
+                parts.append(data)
+            data = b''.join(parts)
+
+        if cache is not None:
+            cache.put(key, data)
+        return data
+
+    def pack_trusted(self, obj=None, **kwargs):
+        """
+        Pack values that are exactly as :py:meth:`make` or :py:meth:`unpack`
+        return them, such as a StarTuple of this message.
+
+        None of the conversions or checks that :py:meth:`pack` makes are
+        repeated, so values in any other form (such as enum names, or bytes
+        for a number) give wrong results or errors.  Checksum values are packed
+        as they are, rather than computed again, so a tuple that has been
+        changed with ``_replace()`` should be made again first.
+        """
+        return self._pack_trusted(self._values(obj, kwargs))
+
+    def _pack_trusted(self, values):
+        """Pack made values, see :py:meth:`pack_trusted`"""
+        if self._fixed is not None:
+            if isinstance(values, TupleFields):
+                return self._fixed.pack(*values._values)  # pylint: disable=protected-access
+            return self._fixed.pack(*[values[name] for name in self._tuple._fields])
+        if not self._uses_spans:
+            return b''.join([elem.pack_trusted(values) for elem in self._elements.values()])
+
+        parts = []
+        spans = {}
+        for elem in self._elements.values():
+            if elem.uses_spans:
+                data = elem.pack_trusted(values, spans)
+            else:
+                data = elem.pack_trusted(values)
+            if elem.name:
+                spans[elem.name] = memoryview(data)
+            parts.append(data)
+        return b''.join(parts)
+
+    def _values(self, obj, kwargs):
+        """
+        Return the values to pack as a mapping.  Tuples and other sequences
+        are wrapped rather than copied into a dictionary.
+        """
         # Handle a positional dictionary argument as well as the more generic kwargs
+        if obj is None or isinstance(obj, dict):
+            return obj or kwargs
+        if isinstance(obj, collections.abc.Mapping):
+            return obj
+
+        fields = getattr(obj, '_fields', None)
+        if fields is not None and fields != self._tuple._fields:
+            # A named tuple of some other message
+            return obj._asdict()
+        if len(obj) != len(self._tuple._fields):
+            raise ValueError('{} has {} fields, got {} values: {}'.format(
+                self.name, len(self._tuple._fields), len(obj), obj))
+        return TupleFields(obj, self._index)
+
+    def pack_into(self, buf, offset=0, obj=None, **kwargs):
+        """
+        Pack the provided values into a writable buffer at an offset, like
+        ``struct.pack_into``.
+
+        :param buf: A writable buffer (such as a bytearray, mmap or shared
+            memory)
+        :param offset: The offset to pack the message at
+        :returns: The number of bytes packed
+        """
+        data = self.pack(obj, **kwargs)
+        view = memoryview(buf)
+        try:
+            if offset + len(data) > len(view):
+                raise struct.error('{} needs a buffer of at least {} bytes for packing {} bytes at offset {}'.format(
+                    self.name, offset + len(data), len(data), offset))
+            view[offset:offset + len(data)] = data
+        finally:
+            view.release()
+        return len(data)
+
+    def overlay(self, buf, offset=0):
+        """
+        Return an object whose attributes read and write the fields of the
+        message packed in a buffer in place, see :py:mod:`starstruct.overlay`.
+
+        :param buf: A bytearray, mmap or writable memoryview
+        :param offset: The offset of the message in the buffer
+        :raises TypeError: If the message has variable elements
+        """
+        if self._overlay is None:
+            self._overlay = overlay_class(self)
+        return self._overlay(buf, offset)
+
+    def template(self, defaults=None, **kwargs):
+        """
+        Return a prepacked prototype of this message, which packs messages
+        that only differ from the defaults in a few fields quickly, see
+        :py:mod:`starstruct.template`.
+
+        :param defaults: The values of every field of the prototype
+        :raises TypeError: If the message has variable elements
+        """
+        if defaults and isinstance(defaults, dict):
+            kwargs = defaults
+        return Template(self, kwargs)
+
+    # pylint: disable=too-many-locals
+    def patch(self, buf, obj=None, **kwargs):
+        """
+        Change some fields of a message packed at the start of a buffer, in
+        place.
+
+        Fixed size fields are simply rewritten.  Variable elements are packed
+        again and replace their old bytes (so the buffer must be a bytearray if
+        their size changes), and the length elements that refer to them are
+        updated.  Any checksum (callable) fields that depend on a changed
+        field are then recomputed from the bytes of the fields they refer to.
+
+        :param buf: A bytearray, or another writable buffer
+        :returns: The size of the patched message
+        """
         if obj and isinstance(obj, dict):
             kwargs = obj
-        return b''.join([elem.pack(kwargs) for elem in self._elements.values()])
 
-    def unpack_partial(self, buf):
+        for name in kwargs:
+            if name not in self._elements or not self._elements[name].name:
+                raise AttributeError('{} has no field {}'.format(self.name, name))
+
+        changed = set(kwargs)
+        (spans, values, size) = self._walk(buf)
+
+        # Variable elements first, since they move everything after them
+        for name, value in kwargs.items():
+            elem = self._elements[name]
+            if not isinstance(elem.format, (Message, dict)):
+                continue
+
+            chunks = list(elem.pack_chunks(dict(values, **kwargs))) if hasattr(elem, 'pack_chunks') \
+                else [elem.pack(dict(values, **kwargs))]
+            data = b''.join(chunks)
+
+            (start, end) = next((start, end) for other, start, end in spans if other is elem)
+            if len(data) != end - start and not isinstance(buf, bytearray):
+                raise TypeError('{} changes size, {} can only be patched in a bytearray'.format(
+                    name, self.name))
+            buf[start:end] = data
+
+            for length, start, end in spans:
+                if hasattr(length, 'pack_value') and length.ref == name and length.name not in kwargs:
+                    count = len(chunks) if elem.variable_repeat else elem.ref
+                    buf[start:end] = length.pack_value(count if length.object_length else len(data))
+                    changed.add(length.name)
+
+            (spans, values, size) = self._walk(buf)
+
+        offsets = {elem.name: (start, end) for elem, start, end in spans if elem.name}
+        for name, value in kwargs.items():
+            elem = self._elements[name]
+            if isinstance(elem.format, (Message, dict)):
+                continue
+            if elem.uses_spans:
+                data = elem._struct.pack(value)  # pylint: disable=protected-access
+            elif hasattr(elem, 'pack_value'):
+                data = elem.pack_value(value)
+            else:
+                data = elem.pack(kwargs)
+
+            (start, end) = offsets[name]
+            buf[start:end] = data
+
+        # The values that other elements are unpacked with (such as the length
+        # of a variable element), only built if a checksum needs them
+        current = None
+        for elem, start, end in spans:
+            # pylint: disable=protected-access
+            if not elem.uses_spans or elem.name in kwargs \
+                    or changed.isdisjoint(name for name, _ in elem._references):
+                continue
+
+            items = []
+            for name, by_bytes in elem._references:
+                (ref_start, ref_end) = offsets[name]
+                if by_bytes:
+                    items.append(buf[ref_start:ref_end])
+                elif name in kwargs:
+                    items.append(self._elements[name].make(kwargs))
+                else:
+                    if current is None:
+                        current = self._tuple._make(values.get(field) for field in self._tuple._fields)
+                    items.append(self._elements[name].unpack(current, buf[ref_start:ref_end])[0])
+
+            buf[start:end] = elem._struct.pack(elem._func_ref(*items))
+            changed.add(elem.name)
+
+        return size
+
+    def pack_stream(self, out, obj=None, **kwargs):  # pylint: disable=too-many-statements
+        """
+        Pack the provided values directly into a bytearray or a writable file.
+
+        The items of variable elements can be supplied by any iterator (such
+        as a generator), and are packed one at a time.  When the number of
+        items is not known in advance (or a byte length is not supplied), space
+        is reserved for the length element and the length is filled in once
+        the items have been packed.
+
+        :param out: A bytearray to extend, or a seekable binary file
+        :returns: The number of bytes written
+        """
+        kwargs = self._values(obj, kwargs)
+
+        if isinstance(out, bytearray):
+            start = len(out)
+
+            def write(data):
+                out.extend(data)
+
+            def patch(offset, data):
+                out[offset:offset + len(data)] = data
+
+            def tell():
+                return len(out)
+        else:
+            if any(elem.uses_spans for elem in self._elements.values()):
+                raise TypeError('{} can only be streamed into a bytearray'.format(self.name))
+            start = out.tell()
+
+            def write(data):
+                out.write(data)
+
+            def patch(offset, data):
+                position = out.tell()
+                out.seek(offset)
+                out.write(data)
+                out.seek(position)
+
+            tell = out.tell
+
+        # The offsets of each element, the length elements that still need to
+        # be filled in, and the byte lengths that were supplied (both keyed by
+        # the element they refer to)
+        offsets = {}
+        pending = {}
+        supplied = {}
+        for elem in self._elements.values():
+            offset = tell()
+            if hasattr(elem, 'pack_value') and (
+                    not hasattr(kwargs.get(elem.ref), '__len__') if elem.object_length
+                    else kwargs.get(elem.name) is None):
+                pending[elem.ref] = (elem, offset)
+                write(elem.pack_value(0))
+            elif hasattr(elem, 'pack_chunks'):
+                count = 0
+                for chunk in elem.pack_chunks(kwargs):
+                    write(chunk)
+                    count += 1
+
+                if elem.name in pending:
+                    (length, length_offset) = pending.pop(elem.name)
+                    value = count if length.object_length else tell() - offset
+                    patch(length_offset, length.pack_value(value))
+                elif elem.name in supplied:
+                    (length, value) = supplied.pop(elem.name)
+                    if value != tell() - offset:
+                        raise ValueError('{} byte length {} of {} does not match the {} bytes packed'.format(
+                            length.name, value, elem.name, tell() - offset))
+            elif elem.uses_spans:
+                # Give the element views of what has been packed so far, and
+                # release them again so the bytearray can keep growing
+                view = memoryview(out)
+                spans = {name: view[begin:end] for name, (begin, end) in offsets.items()}
+                try:
+                    data = elem.pack(kwargs, spans)
+                finally:
+                    for span in spans.values():
+                        span.release()
+                    view.release()
+                write(data)
+            else:
+                if hasattr(elem, 'pack_value') and not elem.object_length:
+                    supplied[elem.ref] = (elem, kwargs[elem.name])
+                write(elem.pack(kwargs))
+
+            if elem.name:
+                offsets[elem.name] = (offset, tell())
+
+        if pending:
+            raise ValueError('{} length elements {} reference no packed element'.format(
+                self.name, list(pending)))
+
+        return tell() - start
+
+    def unpack_partial(self, buf, checks=None):
         """
         Unpack a partial message from a buffer.
 
         This doesn't re-use the "unpack_from" function name from the struct
         module because the parameters and return values are not consistent
         between this function and the struct module.
+
+        :param buf: The bytes to unpack
+        :param checks: A :py:class:`starstruct.elementcallable.PendingChecks`
+            object.  When provided, ElementCallable checks are recorded in it
+            instead of being evaluated during the unpack.
         """
+        if checks is not None:
+            with deferred_checks(checks):
+                return self.unpack_partial(buf)
+
+        # Enforce the decode limits, the limits of the outermost message apply
+        # to everything nested within it.
+        state = starstruct.limits._state  # pylint: disable=protected-access
+        depth = getattr(state, 'depth', 0)
+        if depth:
+            state.limits.check_depth(self.name, depth + 1)
+            state.depth = depth + 1
+            try:
+                return self._unpack_partial(buf)
+            finally:
+                state.depth = depth
+
+        # The buffer may hold more than this message, so only the bytes it
+        # uses count towards max_bytes
+        state.limits = self.limits or starstruct.limits.DEFAULT
+        state.depth = 1
+        try:
+            (msg, unused) = self._unpack_partial(buf)
+            state.limits.check_bytes(self.name, len(buf) - len(unused))
+            return (msg, unused)
+        finally:
+            state.depth = 0
+            state.limits = None
+
+    def _unpack_partial(self, buf):
+        """Unpack a partial message once the limits have been checked"""
+        if self._fixed is not None:
+            msg = self._tuple._make(self._fixed.unpack_from(buf))
+            return (msg, buf[self._fixed.size:])
+
+        # Work on a memoryview of the buffer so that consuming each element
+        # doesn't copy the rest of the buffer.
+        unused = memoryview(buf)
+        spans = {} if self._uses_spans else None
+
         msg = self._tuple._make([None] * len(self._tuple._fields))
         for elem in self._elements.values():
-            (val, unused) = elem.unpack(msg, buf)
-            buf = unused
+            if elem.uses_spans:
+                (val, remaining) = elem.unpack(msg, unused, spans)
+            else:
+                (val, remaining) = elem.unpack(msg, unused)
             # Update the unpacked message with all non-padding elements
             if elem.name:
-                msg = msg._replace(**dict([(elem.name, val)]))
-        return (msg, buf)
+                if spans is not None:
+                    spans[elem.name] = unused[:len(unused) - len(remaining)]
+                msg = msg._replace(**{elem.name: val})
+            unused = remaining
+
+        # Only hand back a view if that is what we were given
+        if not isinstance(buf, memoryview):
+            unused = bytes(unused)
+        return (msg, unused)
+
+    def unpack_from(self, buf, offset=0, checks=None):
+        """
+        Unpack a message from a buffer starting at an offset, like
+        ``struct.unpack_from`` any bytes after the message are ignored.
+
+        :param buf: The bytes (or any buffer such as a memoryview or mmap)
+        :param offset: The offset of the message in the buffer
+        :param checks: See :py:meth:`unpack_partial`
+        """
+        if self._fixed is not None and checks is None:
+            return self._tuple._make(self._fixed.unpack_from(buf, offset))
+
+        (msg, _) = self.unpack_partial(memoryview(buf)[offset:], checks)
+        return msg
+
+    def measure(self, buf):
+        """
+        Return the number of bytes the message at the start of the buffer
+        occupies.
+
+        Only the length and discriminator values needed to find the size of
+        the message are unpacked, everything else is skipped.
+        """
+        if self._fixed is not None:
+            if len(buf) < self._fixed.size:
+                err = 'measure of {} requires a buffer of {} bytes'
+                raise struct.error(err.format(self.name, self._fixed.size))
+            return self._fixed.size
+
+        (_, _, offset) = self._walk(buf)
+        if offset > len(buf):
+            err = 'measure of {} requires a buffer of {} bytes'
+            raise struct.error(err.format(self.name, offset))
+        return offset
 
-    def unpack(self, buf):
-        """Unpack the buffer using the initialized format."""
-        (msg, unused) = self.unpack_partial(buf)
+    def _walk(self, buf):
+        """
+        Find where each element of the message at the start of a buffer is,
+        without unpacking any more than needed, see :py:meth:`measure`.
+
+        :returns: A list of the element, start and end offset of each
+            element, the values of the elements that had to be unpacked, and
+            the size of the message
+        """
+        view = memoryview(buf)
+        spans = []
+        values = {}
+        offset = 0
+        for elem in self._elements.values():
+            start = offset
+            if isinstance(elem.format, Message):
+                variant = elem.format
+                if not elem.variable_repeat:
+                    count = elem.ref
+                elif elem.object_length:
+                    count = values[elem.ref]
+                else:
+                    # Byte length sections are simply skipped
+                    count = None
+                    offset += values[elem.ref]
+
+                if count is not None:
+                    # pylint: disable=protected-access
+                    starstruct.limits.current().check_items(
+                        elem.name, count, len(view) - offset, variant._min_size)
+                    if variant._fixed is not None:
+                        offset += count * variant._fixed.size
+                    else:
+                        for _ in range(count):
+                            offset += variant.measure(view[offset:])
+            elif isinstance(elem.format, dict):
+                variant = elem.dispatch[values[elem.ref]]
+                if variant is not None:
+                    offset += variant.measure(view[offset:])
+            elif elem.uses_spans:
+                # Checks are not made while measuring
+                offset += elem._struct.size  # pylint: disable=protected-access
+            elif elem.name in self._referenced or elem.raw_format() is None:
+                (val, unused) = elem.unpack(None, view[offset:])
+                values[elem.name] = val
+                offset = len(view) - len(unused)
+            else:
+                offset += elem._struct.size  # pylint: disable=protected-access
+            spans.append((elem, start, offset))
+
+        view.release()
+        return (spans, values, offset)
+
+    def unpack(self, buf, checks=None):
+        """
+        Unpack the buffer using the initialized format.
+
+        :param buf: The bytes to unpack
+        :param checks: See :py:meth:`unpack_partial`
+        """
+        cache = self.unpack_cache
+        if cache is not None and checks is None:
+            key = buffer_key(buf)
+            msg = cache.get(key)
+            if msg is None:
+                # Unpack an immutable copy, since lazily unpacked values keep
+                # referring to the buffer
+                msg = immutable(self._unpack_all(key if isinstance(key, bytes) else bytes(buf)))
+                cache.put(key, msg)
+            return msg
+
+        return self._unpack_all(buf, checks)
+
+    def _unpack_all(self, buf, checks=None):
+        """Unpack a buffer, which the message must use all of"""
+        # Reject buffers that are too large before unpacking any of them
+        if not starstruct.limits.current_depth():
+            (self.limits or starstruct.limits.DEFAULT).check_bytes(self.name, len(buf))
+
+        (msg, unused) = self.unpack_partial(buf, checks)
         if unused:
             error = 'buffer not fully used by unpack: {}'.format(unused)
             raise ValueError(error)
+
+        # Immutable buffers are kept, so packing the tuple again is free (as
+        # long as none of its values can be changed, see StarTuple.pack)
+        if type(buf) is bytes:  # pylint: disable=unidiomatic-typecheck
+            msg._packed = (self._generation, buf)  # pylint: disable=protected-access
         return msg
 
     def make(self, obj=None, **kwargs):
@@ -162,6 +951,64 @@ class Message(object):
         # msg.__packed = self.pack(**kwargs)
         return msg
 
+    def fingerprint(self):
+        """
+        Return a digest of the structure of this message, which changes if
+        any element, format, mode or alignment of the message changes.
+        """
+        return hashlib.sha1(self._describe().encode('utf-8')).digest()
+
+    def _describe(self):
+        """Return a string that describes the structure of this message"""
+        def describe(item):  # pylint: disable=too-many-return-statements
+            if isinstance(item, Message):
+                return item._describe()  # pylint: disable=protected-access
+            if isinstance(item, dict):
+                return '{' + ','.join(sorted(describe(key) + ':' + describe(val)
+                                             for key, val in item.items())) + '}'
+            if isinstance(item, type) and issubclass(item, enum.Enum):
+                return '{}.{}({})'.format(item.__module__, item.__qualname__,
+                                          ','.join('{}={!r}'.format(m.name, m.value) for m in item))
+            if isinstance(item, enum.Enum):
+                return '{}.{}'.format(describe(type(item)), item.name)
+            if hasattr(item, 'enum'):
+                # BitField
+                return 'BitField({})'.format(describe(item.enum))
+            if isinstance(item, Incremental):
+                return 'Incremental({})'.format(describe(item._func))  # pylint: disable=protected-access
+            if isinstance(item, types.FunctionType) and '<' in item.__qualname__:
+                # Lambdas and local functions don't have unique names, so they
+                # are told apart by their code and the values they enclose
+                code = item.__code__
+                consts = [const.co_code.hex() if isinstance(const, types.CodeType) else repr(const)
+                          for const in code.co_consts]
+                cells = [cell.cell_contents.__qualname__ if callable(cell.cell_contents) else describe(cell.cell_contents)
+                         for cell in item.__closure__ or ()]
+                return '{}.{}[{},{},{},{}]'.format(item.__module__, item.__qualname__, code.co_code.hex(),
+                                                   ','.join(consts), ','.join(code.co_names), ','.join(cells))
+            if callable(item) and hasattr(item, '__qualname__'):
+                return '{}.{}'.format(item.__module__, item.__qualname__)
+            return repr(item)
+
+        elements = []
+        for elem in self._elements.values():
+            parts = [type(elem).__name__, str(elem.name), describe(elem.format),
+                     describe(getattr(elem, 'ref', None))]
+            if hasattr(elem, '_func_ref'):
+                # pylint: disable=protected-access
+                parts += [describe(elem._func_ref), describe(elem._func_args),
+                          describe(elem._error_on_bad_result)]
+            if hasattr(elem, 'values'):
+                # ElementConstant
+                parts.append(describe(elem.values))
+            if getattr(elem, 'container', None) is not None:
+                parts.append(describe(elem.container))
+            if getattr(elem, 'raw', False):
+                parts.append('raw')
+            elements.append('(' + ','.join(parts) + ')')
+
+        return '{}[{},{}]({})'.format(self.name, self.mode.value, self.alignment, ','.join(elements))
+
     def __len__(self):
         if self._elements == {}:
             return 0
@@ -0,0 +1,115 @@
+"""
+Read and write the fields of a packed message in place.
+
+.. code-block:: python
+
+    frame = bytearray(Status.pack(status))
+
+    view = Status.overlay(frame)
+    view.sequence += 1
+    view.mode = StatusMode.idle
+
+Each field is read or written directly at its offset in the buffer, with the
+same conversions (enums, bitfields, fixed point numbers, strings) as packing
+and unpacking the whole message.  Only messages without variable elements can
+be overlaid.
+
+Checksum (callable) fields are read and written as raw values, they are not
+recomputed when other fields are written.
+"""
+
+import struct
+
+from starstruct.elementconstant import ElementConstant
+
+
+class Overlay(object):
+    """
+    The base class of the overlay class of each message, see
+    :py:meth:`starstruct.message.Message.overlay`.
+
+    :param buf: The buffer (such as a bytearray, mmap or writable memoryview)
+    :param offset: The offset of the message in the buffer
+    """
+    __slots__ = ('_buf', '_offset')
+
+    _message = None
+    _size = 0
+
+    def __init__(self, buf, offset: int=0):
+        if offset < 0 or offset + self._size > len(buf):
+            raise struct.error('overlay of {} requires a buffer of at least {} bytes'.format(
+                self._message.name, offset + self._size))
+
+        self._buf = buf
+        self._offset = offset
+
+    def _unpack(self):
+        """Unpack the entire message"""
+        return self._message.unpack_from(self._buf, self._offset)
+
+    def _update(self, **values) -> None:
+        """Write several fields at once"""
+        for name, value in values.items():
+            if name not in self._message._tuple._fields:  # pylint: disable=protected-access
+                raise AttributeError('{} has no field {}'.format(self._message.name, name))
+            setattr(self, name, value)
+
+    def __bytes__(self):
+        return bytes(self._buf[self._offset:self._offset + self._size])
+
+    def __repr__(self):
+        return '{}.overlay({!r})'.format(self._message.name, self._unpack())
+
+
+def _field(message, elem, offset):
+    """Create the property that reads and writes one element"""
+    raw_format = elem.raw_format()
+    if raw_format is not None or elem.uses_spans:
+        if raw_format is not None:
+            raw = struct.Struct(message.mode.value + raw_format)
+        else:
+            raw = elem._struct  # pylint: disable=protected-access
+
+        def get_raw(self):
+            return raw.unpack_from(self._buf, self._offset + offset)[0]  # pylint: disable=protected-access
+
+        def set_raw(self, value):
+            raw.pack_into(self._buf, self._offset + offset, value)  # pylint: disable=protected-access
+
+        return property(get_raw, set_raw)
+
+    size = elem._struct.size  # pylint: disable=protected-access
+    name = elem.name
+
+    def get_value(self):
+        start = self._offset + offset  # pylint: disable=protected-access
+        return elem.unpack(None, self._buf[start:start + size])[0]  # pylint: disable=protected-access
+
+    def set_value(self, value):
+        start = self._offset + offset  # pylint: disable=protected-access
+        self._buf[start:start + size] = elem.pack({name: value})  # pylint: disable=protected-access
+
+    if isinstance(elem, ElementConstant):
+        return property(get_value)
+    return property(get_value, set_value)
+
+
+def overlay_class(message) -> type:
+    """
+    Create the overlay class of a message.
+
+    :raises TypeError: If the message has variable elements
+    """
+    if message._size is None:  # pylint: disable=protected-access
+        raise TypeError('{} is not a fixed size message'.format(message.name))
+
+    namespace = {
+        '__slots__': (),
+        '_message': message,
+        '_size': message._size,  # pylint: disable=protected-access
+    }
+    for name, (offset, elem) in message._offsets.items():  # pylint: disable=protected-access
+        namespace[name] = _field(message, elem, offset)
+
+    return type(message.name + 'Overlay', (Overlay,), namespace)
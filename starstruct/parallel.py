@@ -0,0 +1,140 @@
+"""
+Unpack large record files across several processes.
+
+.. code-block:: python
+
+    def total(records):
+        return sum(record.value for record in records)
+
+    # The sum of each chunk of records, in the order of the file
+    totals = list(unpack_file('capture.bin', Sample, workers=8, fn=total))
+
+The file is split into chunks of whole records, using the record size for
+fixed size messages, or the offset index (see :py:mod:`starstruct.io`) for
+variable size messages.  Each worker process maps the file itself, so the file
+is only ever read through the shared page cache, and only the results of
+``fn`` are sent back from the workers.
+
+The message and ``fn`` are handed to the worker processes when they start, and
+the results of ``fn`` must be picklable (unpacked records are, see
+:py:meth:`starstruct.message.Message.__reduce__`).
+
+This module requires Python 3.7 or later, for the initializer of
+:py:class:`concurrent.futures.ProcessPoolExecutor`.
+"""
+
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import Callable, Iterator, Optional
+
+from starstruct.io import RecordFile
+from starstruct.message import Message, PortableMessage
+
+
+# The state of a worker process, set by _init_worker
+_worker = {}
+
+
+def _init_worker(path, message, fn):
+    """Map the file in a worker process"""
+    handle = open(path, 'rb')
+    _worker['file'] = handle
+    _worker['mmap'] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    # The message is only unpickled (as itself) by start methods other than fork
+    if isinstance(message, PortableMessage):
+        message = message.message
+    _worker['message'] = message
+    _worker['fn'] = fn
+
+
+def _records(message, view):
+    """Yield each record in a view of whole records"""
+    fixed = message._fixed  # pylint: disable=protected-access
+    if fixed is not None:
+        yield from map(message._tuple._make, fixed.iter_unpack(view))  # pylint: disable=protected-access
+        return
+
+    while view:
+        (msg, view) = message.unpack_partial(view)
+        yield msg
+
+
+def _unpack_chunk(start, end):
+    """Unpack the records between two offsets of the file"""
+    view = memoryview(_worker['mmap'])[start:end]
+    message = _worker['message']
+
+    fn = _worker['fn']
+    if fn is None:
+        # Only the values are sent back, the tuples are made by the caller
+        return list(message._fixed.iter_unpack(view))  # pylint: disable=protected-access
+    return fn(_records(message, view))
+
+
+def chunks(record_file: RecordFile, count: int) -> Iterator[tuple]:
+    """
+    Yield the start and end offsets of chunks of ``count`` whole records.
+
+    :param record_file: The (fixed size or indexed) file to split
+    :param count: The number of records in each chunk
+    """
+    length = len(record_file)
+    if record_file.index is not None:
+        offsets = record_file.index.offsets
+        end = record_file.index.end
+        for first in range(0, length, count):
+            last = first + count
+            yield (offsets[first], offsets[last] if last < length else end)
+    else:
+        size = record_file.message._fixed.size  # pylint: disable=protected-access
+        for first in range(0, length, count):
+            yield (first * size, min(first + count, length) * size)
+
+
+# pylint: disable=too-many-arguments
+def unpack_file(path, message: Message, workers: Optional[int]=None,
+                fn: Optional[Callable]=None, chunk_records: Optional[int]=None,
+                mp_context=None) -> Iterator:
+    """
+    Unpack a file of records in a pool of worker processes.
+
+    :param path: The path of the record file
+    :param message: The message of each record
+    :param workers: The number of worker processes, by default the number of
+        CPUs
+    :param fn: A function called with an iterator of the records of each
+        chunk in a worker process.  Its results are yielded in file order.
+        When not provided every record is yielded in file order, only the
+        records of fixed size messages are unpacked in the worker processes
+        (variable size records are unpacked in this process).
+    :param chunk_records: The number of records in each chunk, by default
+        the records are split into 4 chunks per worker
+    :param mp_context: The multiprocessing context for the worker processes
+    """
+    with RecordFile(path, message, index=fn is not None) as record_file:
+        if fn is None and message._fixed is None:  # pylint: disable=protected-access
+            # Sending records back would cost more than unpacking them here
+            yield from record_file
+            return
+
+        length = len(record_file)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(path, message.portable(), fn)) as executor:
+            if chunk_records is None:
+                # pylint: disable=protected-access
+                chunk_records = max(1, -(-length // (executor._max_workers * 4)))
+
+            futures = [executor.submit(_unpack_chunk, start, end)
+                       for start, end in chunks(record_file, chunk_records)]
+            try:
+                for future in futures:
+                    if fn is None:
+                        yield from map(message._tuple._make, future.result())  # pylint: disable=protected-access
+                    else:
+                        yield future.result()
+            finally:
+                # Don't wait for the rest of the file if the caller stops early
+                for future in futures:
+                    future.cancel()
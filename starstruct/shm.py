@@ -0,0 +1,191 @@
+"""
+Hand fixed size records between processes through shared memory.
+
+.. code-block:: python
+
+    ring = RecordRing(Sample, capacity=4096)
+
+    # In the producer process
+    if not ring.put(time=now, value=reading):
+        ...  # the ring is full
+
+    # In the consumer process
+    for record in ring.get_many():
+        ...
+
+Records are packed straight into a slot of the shared memory, and unpacked
+straight out of it, without any pickling or copies through a pipe.  The ring
+only supports a single producer and a single consumer.
+
+A ring can be passed to another process like any other argument (only its
+name and message are pickled), or attached by name with :py:meth:`RecordRing.attach`.
+
+This module requires Python 3.8 or later, for
+:py:mod:`multiprocessing.shared_memory`.
+"""
+
+import struct
+
+from multiprocessing import shared_memory
+from typing import Optional
+
+from starstruct.message import Message
+
+
+# capacity, slot size, records written, records read
+RING_HEADER = struct.Struct('<QQQQ')
+_COUNTER = struct.Struct('<Q')
+_HEAD_OFFSET = 16
+_TAIL_OFFSET = 24
+
+
+class RecordRing(object):
+    """
+    A single producer, single consumer ring of fixed size records in shared
+    memory.
+
+    :param message: The fixed size message of each record
+    :param capacity: The number of record slots, when creating the ring
+    :param name: The name of the shared memory, when attaching to a ring
+    """
+    def __init__(self, message: Message, capacity: Optional[int]=None, name: Optional[str]=None):
+        fixed = message._fixed  # pylint: disable=protected-access
+        if fixed is None:
+            raise TypeError('{} is not a fixed size message'.format(message.name))
+
+        self.message = message
+        self._struct = fixed
+        self._make = message._tuple._make  # pylint: disable=protected-access
+
+        if name is None:
+            if not capacity or capacity < 1:
+                raise ValueError('invalid capacity: {}'.format(capacity))
+
+            size = RING_HEADER.size + capacity * fixed.size
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            RING_HEADER.pack_into(self._shm.buf, 0, capacity, fixed.size, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            (capacity, slot_size, _, _) = RING_HEADER.unpack_from(self._shm.buf)
+            if slot_size != fixed.size:
+                self._shm.close()
+                raise ValueError('{} records are {} bytes, ring {} has {} byte slots'.format(
+                    message.name, fixed.size, name, slot_size))
+
+        self.capacity = capacity
+        self._buf = self._shm.buf
+
+    @classmethod
+    def attach(cls, name: str, message: Message):
+        """Attach to a ring created by another process"""
+        return cls(message, name=name)
+
+    def __reduce__(self):
+        return (self.attach, (self.name, self.message.portable()))
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory"""
+        return self._shm.name
+
+    def _head(self):
+        return _COUNTER.unpack_from(self._buf, _HEAD_OFFSET)[0]
+
+    def _tail(self):
+        return _COUNTER.unpack_from(self._buf, _TAIL_OFFSET)[0]
+
+    def _offset(self, count):
+        return RING_HEADER.size + (count % self.capacity) * self._struct.size
+
+    def __len__(self):
+        """The number of records waiting to be read"""
+        return self._head() - self._tail()
+
+    def put(self, obj=None, **kwargs) -> bool:
+        """
+        Pack a record into the next free slot.
+
+        :returns: False if the ring is full
+        """
+        head = self._head()
+        if head - self._tail() >= self.capacity:
+            return False
+
+        # The record must be complete before the consumer can see it
+        self.message.pack_into(self._buf, self._offset(head), obj, **kwargs)
+        _COUNTER.pack_into(self._buf, _HEAD_OFFSET, head + 1)
+        return True
+
+    def get(self):
+        """
+        Unpack the oldest record, returns None if the ring is empty.
+        """
+        tail = self._tail()
+        if tail == self._head():
+            return None
+
+        record = self._make(self._struct.unpack_from(self._buf, self._offset(tail)))
+        _COUNTER.pack_into(self._buf, _TAIL_OFFSET, tail + 1)
+        return record
+
+    def get_many(self, count: Optional[int]=None) -> list:
+        """
+        Unpack up to ``count`` of the oldest records (by default all of the
+        waiting records).
+        """
+        tail = self._tail()
+        available = self._head() - tail
+        if count is not None:
+            available = min(available, count)
+
+        records = []
+        size = self._struct.size
+        while available:
+            # Unpack the contiguous slots up to the end of the ring at once
+            start = tail % self.capacity
+            run = min(available, self.capacity - start)
+            offset = RING_HEADER.size + start * size
+            view = self._buf[offset:offset + run * size]
+            records.extend(map(self._make, self._struct.iter_unpack(view)))
+            view.release()
+
+            tail += run
+            available -= run
+
+        _COUNTER.pack_into(self._buf, _TAIL_OFFSET, tail)
+        return records
+
+    def peek(self) -> Optional[memoryview]:
+        """
+        Return a view of the oldest record without unpacking it, or None if
+        the ring is empty.  The slot is not reused until :py:meth:`advance` is
+        called, and the view must not be used after that.
+        """
+        tail = self._tail()
+        if tail == self._head():
+            return None
+
+        offset = self._offset(tail)
+        return self._buf[offset:offset + self._struct.size]
+
+    def advance(self) -> None:
+        """Release the slot of the record returned by :py:meth:`peek`"""
+        tail = self._tail()
+        if tail == self._head():
+            raise ValueError('ring {} is empty'.format(self.name))
+        _COUNTER.pack_into(self._buf, _TAIL_OFFSET, tail + 1)
+
+    def close(self) -> None:
+        """Close this process' access to the ring"""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the shared memory, once every process has closed it"""
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,8 +1,11 @@
 
 import collections
+import copy
 
+from starstruct.cache import is_immutable
 
-def StarTuple(name, named_fields, elements):
+
+def StarTuple(name, named_fields, elements, message=None):
     restricted_fields = {
         # Default dunders
         '__getnewargs__',
@@ -29,13 +32,26 @@ def StarTuple(name, named_fields, elements):
     if intersection:
         raise ValueError('Restricted field used. Bad fields: {0}'.format(intersection))
 
-    named_tuple = collections.namedtuple(name, named_fields)
+    # Unlike the namedtuple itself, the subclass has an instance __dict__,
+    # which holds the packed bytes of the tuple once they are known
+    named_tuple = type(name, (collections.namedtuple(name, named_fields),), {})
 
     def this_pack(self):
-        packed = bytes()
-        for key, value in self._elements.items():
-            packed += value.pack(self._asdict())
-
+        # The packed bytes are kept as long as the message hasn't been updated
+        # since, and only if none of the values (such as lists) can change
+        if message is None:
+            values = self._asdict()
+            return b''.join(value.pack(values) for value in elements.values())
+
+        # pylint: disable=protected-access
+        immutable = is_immutable(self)
+        memo = self.__dict__.get('_packed')
+        if immutable and memo is not None and memo[0] == message._generation:
+            return memo[1]
+
+        packed = message.pack(self)
+        if immutable:
+            self._packed = (message._generation, packed)
         return packed
 
     def this_str(self):
@@ -55,8 +71,27 @@ def StarTuple(name, named_fields, elements):
 
         return fmt
 
+    def this_reduce(self):
+        # Records are pickled as their packed bytes and the fingerprint of
+        # their message
+        from starstruct.message import _unpack_record
+        return (_unpack_record, (message._fingerprint, message.name, self.pack()))  # pylint: disable=protected-access
+
+    def this_copy(self):
+        return self
+
+    def this_deepcopy(self, memo):
+        # Copied like any other tuple, rather than pickled
+        return self._make(copy.deepcopy(value, memo) for value in self)
+
     named_tuple.pack = this_pack
     named_tuple.__str__ = this_str
     named_tuple._elements = elements
+    named_tuple._message = message  # pylint: disable=protected-access
+
+    if message is not None:
+        named_tuple.__reduce__ = this_reduce
+        named_tuple.__copy__ = this_copy
+        named_tuple.__deepcopy__ = this_deepcopy
 
     return named_tuple
@@ -0,0 +1,95 @@
+"""
+Pack messages that differ from a prototype in only a few fields.
+
+.. code-block:: python
+
+    status = Status.template(kind=Kind.idle, name='pump', temperature=0)
+
+    for sequence in itertools.count():
+        send(status.pack(sequence=sequence, temperature=read_temperature()))
+
+The defaults (and any constants and padding) are packed once, each call to
+:py:meth:`Template.pack` copies the prototype and writes only the changed
+fields in place.  Any checksum (callable) fields that depend on a changed
+field are then recomputed over the final bytes.
+"""
+
+import struct
+
+
+class Template(object):
+    """
+    A prepacked prototype of a message without variable elements, see
+    :py:meth:`starstruct.message.Message.template`.
+
+    :param message: The message to pack
+    :param defaults: The values of every field of the prototype
+    """
+    def __init__(self, message, defaults: dict):
+        if message._size is None:  # pylint: disable=protected-access
+            raise TypeError('{} is not a fixed size message'.format(message.name))
+
+        self.message = message
+        self.prototype = message.pack(defaults)
+
+        # The checksum fields in the order they are packed, with their offset,
+        # the fields they refer to, and where each of their arguments comes from
+        self._checks = []
+        for offset, elem in message._offsets.values():  # pylint: disable=protected-access
+            if not elem.uses_spans:
+                continue
+
+            args = []
+            for name, by_bytes in elem._references:  # pylint: disable=protected-access
+                if by_bytes:
+                    (start, ref) = message._offsets[name]  # pylint: disable=protected-access
+                    args.append((start, start + ref._struct.size))  # pylint: disable=protected-access
+                else:
+                    args.append(name)
+
+            refs = {name for name, _ in elem._references}  # pylint: disable=protected-access
+            self._checks.append((elem, offset, refs, args))
+
+    def __len__(self):
+        return len(self.prototype)
+
+    def pack(self, obj=None, **changes) -> bytes:
+        """Pack the prototype with some fields changed"""
+        buf = bytearray(self.prototype)
+        self._apply(buf, 0, obj or changes)
+        return bytes(buf)
+
+    def pack_into(self, buf, offset: int=0, obj=None, **changes) -> int:
+        """
+        Pack the prototype with some fields changed into a writable buffer,
+        like :py:meth:`starstruct.message.Message.pack_into`.
+
+        :returns: The number of bytes packed
+        """
+        size = len(self.prototype)
+        if offset + size > len(buf):
+            raise struct.error('{} needs a buffer of at least {} bytes for packing {} bytes at offset {}'.format(
+                self.message.name, offset + size, size, offset))
+
+        buf[offset:offset + size] = self.prototype
+        self._apply(buf, offset, obj or changes)
+        return size
+
+    def _apply(self, buf, offset, changes):
+        """Write the changed fields, and recompute the checksums they affect"""
+        view = self.message.overlay(buf, offset)
+        changed = set()
+        for name, value in changes.items():
+            if name not in self.message._offsets:  # pylint: disable=protected-access
+                raise AttributeError('{} has no field {}'.format(self.message.name, name))
+            setattr(view, name, value)
+            changed.add(name)
+
+        for elem, elem_offset, refs, args in self._checks:
+            if elem.name in changes or refs.isdisjoint(changed):
+                continue
+
+            items = [buf[offset + arg[0]:offset + arg[1]] if isinstance(arg, tuple) else getattr(view, arg)
+                     for arg in args]
+            elem._struct.pack_into(buf, offset + elem_offset, elem._func_ref(*items))  # pylint: disable=protected-access
+            changed.add(elem.name)
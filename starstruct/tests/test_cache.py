@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""Tests for the pack and unpack caches"""
+
+import enum
+import time
+import unittest
+from zlib import crc32
+
+import pytest
+
+from starstruct.cache import CacheInfo, LRUCache, freeze
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class State(enum.Enum):
+    """Node states"""
+    up = 1
+    down = 2
+
+
+Node = Message('Node', [('id', 'B'), ('state', 'B', State)])
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestLRUCache(unittest.TestCase):
+    """LRUCache tests"""
+
+    def test_lru(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1
+
+        # b is the least recently used
+        cache.put('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+        assert cache.info() == CacheInfo(hits=2, misses=1, evictions=1, maxsize=2, currsize=2)
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.info().hits == 2
+
+        with pytest.raises(ValueError):
+            LRUCache(0)
+
+    def test_freeze(self):
+        assert freeze({'a': 1, 'b': [1, 2]}) == freeze({'b': [1, 2], 'a': 1})
+        assert freeze({'a': 1}) != freeze({'a': 1.0})
+        assert freeze({'a': 0.0}) != freeze({'a': -0.0})
+        assert freeze({'a': Node.make(id=1, state=State.up)}) == freeze({'a': {'id': 1, 'state': State.up}})
+
+        with pytest.raises(TypeError):
+            freeze({'a': bytearray()})
+
+
+class TestPackCache(unittest.TestCase):
+    """Message pack cache tests"""
+
+    def test_pack(self):
+        status = Message('Status', [
+            ('sequence', 'H'),
+            ('count', 'B', 'nodes'),
+            ('nodes', Node, 'count'),
+            ('crc', 'I', crc32, [b'nodes']),
+        ], Mode.Big, pack_cache=2)
+
+        values = {'sequence': 1, 'nodes': [{'id': 1, 'state': State.up}]}
+        packed = status.pack(values)
+        assert status.pack(values) is packed
+        assert status.pack(sequence=1, nodes=[{'id': 1, 'state': State.up}]) is packed
+        assert status.pack(dict(values, sequence=2)) != packed
+        assert status.pack_cache.info() == CacheInfo(hits=2, misses=2, evictions=0, maxsize=2, currsize=2)
+
+        # Unhashable values are packed, but not cached
+        assert status.pack(sequence=1, nodes=[{'id': 1, 'state': State.up, 'extra': bytearray()}]) == packed
+        assert status.pack_cache.info().currsize == 2
+
+        # Invalid values still fail every time
+        with pytest.raises(AttributeError):
+            status.pack(sequence=1.0, nodes=[])
+        with pytest.raises(AttributeError):
+            status.pack(sequence=1.0, nodes=[])
+
+    def test_signed_zero(self):
+        msg = Message('Float', [('v', 'd')], Mode.Little, pack_cache=4)
+        assert msg.pack(v=0.0) == b'\x00' * 8
+        assert msg.pack(v=-0.0) == b'\x00' * 7 + b'\x80'
+        assert msg.pack(v=0.0) == b'\x00' * 8
+
+    def test_update(self):
+        msg = Message('Update', [('a', 'H')], Mode.Little, pack_cache=4)
+        assert msg.pack(a=1) == b'\x01\x00'
+
+        msg.update(Mode.Big)
+        assert len(msg.pack_cache) == 0
+        assert msg.pack(a=1) == b'\x00\x01'
+
+    def test_non_deterministic(self):
+        def now():
+            """A timestamp"""
+            return int(time.time())
+
+        fields = [('id', 'B'), ('time', 'I', now, [])]
+        with pytest.raises(ValueError):
+            Message('Stamped', fields, pack_cache=4)
+
+        outer = Message('Outer', [('stamped', Message('Stamped', fields), 1)])
+        with pytest.raises(ValueError):
+            outer.set_pack_cache(4)
+
+        outer.set_pack_cache(0)
+        assert outer.pack_cache is None
+
+
+class TestUnpackCache(unittest.TestCase):
+    """Message unpack cache tests"""
+
+    def setUp(self):
+        self.status = Message('Status', [
+            ('sequence', 'H'),
+            ('count', 'B', 'nodes'),
+            ('nodes', Node, 'count'),
+            ('name', '3s'),
+            ('crc', 'I', crc32, [b'nodes']),
+        ], Mode.Big, unpack_cache=2)
+        self.values = {'sequence': 1, 'nodes': [{'id': 1, 'state': State.up}], 'name': 'abc'}
+
+    def test_unpack(self):
+        packed = self.status.pack(self.values)
+        record = self.status.unpack(packed)
+        assert self.status.unpack(bytearray(packed)) is record
+        assert self.status.unpack(memoryview(packed)) is record
+
+        # Lists are converted to tuples
+        assert record.nodes == (Node.make(id=1, state=State.up),)
+        assert self.status.pack(record._asdict()) == packed
+
+        other = self.status.pack(dict(self.values, sequence=2))
+        assert self.status.unpack(other).sequence == 2
+        self.status.unpack(self.status.pack(dict(self.values, sequence=3)))
+        assert self.status.unpack_cache.info() == CacheInfo(hits=2, misses=3, evictions=1, maxsize=2, currsize=2)
+
+        # Invalid buffers are not cached
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                self.status.unpack(packed + b'\x00')
+        assert self.status.unpack_cache.info().currsize == 2
+
+    def test_large(self):
+        values = dict(self.values, nodes=[{'id': i, 'state': State.down} for i in range(200)])
+        packed = bytearray(self.status.pack(values))
+        record = self.status.unpack(packed)
+        assert self.status.unpack(bytes(packed)) is record
+
+        packed[3] = 7
+        packed[-4:] = crc32(packed[3:-7]).to_bytes(4, 'big')
+        assert self.status.unpack(packed).nodes[0].id == 7
+
+    def test_update(self):
+        msg = Message('Update', [('a', 'H')], Mode.Little, unpack_cache=4)
+        assert msg.unpack(b'\x01\x00').a == 1
+
+        msg.update(Mode.Big)
+        assert msg.unpack(b'\x01\x00').a == 256
+        msg.set_unpack_cache(0)
+        assert msg.unpack_cache is None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""Tests for delta encoding"""
+
+import enum
+import struct
+import unittest
+from zlib import crc32
+
+import pytest
+
+from starstruct.delta import DeltaCodec
+from starstruct.elementcallable import Incremental
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class State(enum.Enum):
+    """Telemetry states"""
+    idle = 1
+    busy = 2
+
+
+Sample = Message('Sample', [('time', 'I'), ('value', 'h')], Mode.Little)
+
+Telemetry = Message('Telemetry', [
+    ('sequence', 'I'),
+    ('state', 'B', State),
+    ('pad', '3x'),
+    ('name', '8s'),
+    ('count', 'H', 'samples'),
+    ('samples', Sample, 'count'),
+    ('crc', 'I', Incremental(crc32), [b'sequence', b'samples']),
+], Mode.Little)
+
+first = {
+    'sequence': 1,
+    'state': State.idle,
+    'name': 'pump',
+    'samples': [{'time': 1, 'value': 2}],
+}
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestDeltaCodec(unittest.TestCase):
+    """DeltaCodec tests"""
+
+    def setUp(self):
+        self.codec = DeltaCodec(Telemetry)
+        self.previous = Telemetry.unpack(Telemetry.pack(first))
+
+    def test_unchanged(self):
+        delta = self.codec.encode(self.previous, self.previous)
+        assert delta == b'\x00'
+        assert self.codec.decode(self.previous, delta) == self.previous
+
+    def test_fixed_fields(self):
+        current = Telemetry.make(dict(first, sequence=2))
+        delta = self.codec.encode(self.previous, current)
+
+        # The sequence and the checksum that covers it
+        assert delta == bytes([0b100001]) + struct.pack('<I', 2) + Telemetry.pack(current._asdict())[-4:]
+        assert self.codec.decode(self.previous, delta) == current
+
+    def test_variable_fields(self):
+        current = Telemetry.make(dict(first, state=State.busy, samples=[{'time': 1, 'value': 2}, {'time': 3, 'value': 4}]))
+        delta = self.codec.encode(self.previous, current)
+        assert delta[0] == 0b111010
+        assert delta[4] == 12
+        assert self.codec.decode(self.previous, delta) == current
+        assert self.codec.apply(Telemetry.pack(first), delta) == Telemetry.pack(current._asdict())
+
+    def test_no_previous(self):
+        delta = self.codec.encode(None, self.previous)
+        assert delta[0] == 0b111111
+        assert self.codec.decode(None, delta) == self.previous
+
+        with pytest.raises(ValueError):
+            self.codec.decode(None, b'\x01' + struct.pack('<I', 2))
+
+    def test_invalid(self):
+        delta = self.codec.encode(self.previous, dict(first, sequence=2))
+        with pytest.raises(struct.error):
+            self.codec.decode(self.previous, delta[:-1])
+        with pytest.raises(struct.error):
+            self.codec.decode(self.previous, b'')
+        with pytest.raises(ValueError):
+            self.codec.decode(self.previous, delta + b'\x00')
+
+        # A large variable element
+        samples = [{'time': i, 'value': i} for i in range(100)]
+        delta = self.codec.encode(self.previous, dict(first, samples=samples))
+        assert self.codec.decode(self.previous, delta).samples == Telemetry.make(dict(first, samples=samples)).samples
+        with pytest.raises(struct.error):
+            self.codec.decode(self.previous, delta[:6])
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""Tests for the frame dispatcher"""
+
+import enum
+import unittest
+
+import pytest
+
+from starstruct.dispatcher import Dispatcher
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class FrameType(enum.Enum):
+    """Frame ids for testing"""
+    status = 1
+    data = 2
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestDispatcher(unittest.TestCase):
+    """Dispatcher tests"""
+
+    Header = Message('Header', [
+        ('sync', 'B'),
+        ('id', 'H'),
+    ], Mode.Big)
+
+    Status = Message('Status', [
+        ('state', 'B'),
+        ('name', '4s'),
+    ], Mode.Big)
+
+    Data = Message('Data', [
+        ('count', 'B', 'values'),
+        ('values', Message('Value', [('value', 'H')], Mode.Big), 'count'),
+    ], Mode.Big)
+
+    def test_header_message(self):
+        dispatcher = Dispatcher({
+            FrameType.status: self.Status,
+            FrameType.data: self.Data,
+        }, self.Header, field='id')
+
+        status = self.Header.pack(sync=0xAA, id=1) + self.Status.pack(state=3, name='abcd')
+        data = self.Header.pack(sync=0xAA, id=2) + self.Data.pack(values=[{'value': 7}, {'value': 9}])
+
+        (frame_id, body) = dispatcher.unpack(status)
+        assert frame_id == 1
+        assert body == self.Status.make(state=3, name='abcd')
+
+        (frame_id, body) = dispatcher.unpack(data)
+        assert frame_id == 2
+        assert [item.value for item in body.values] == [7, 9]
+
+        dispatcher.unpack(data)
+        assert dispatcher.counts[1] == 1
+        assert dispatcher.counts[2] == 2
+
+        with pytest.raises(ValueError):
+            dispatcher.unpack(self.Header.pack(sync=0xAA, id=3))
+        assert dispatcher.misses == 1
+
+    def test_offset_and_format(self):
+        Frame = Message('Frame', [
+            ('id', 'B'),
+            ('state', 'B'),
+            ('name', '4s'),
+        ])
+
+        dispatcher = Dispatcher({5: Frame}, (0, 'B'), body_offset=0)
+        (frame_id, body) = dispatcher.unpack(Frame.pack(id=5, state=1, name='wxyz'))
+        assert frame_id == 5
+        assert body.name == 'wxyz'
+
+    def test_bad_header(self):
+        with pytest.raises(TypeError):
+            Dispatcher({}, self.Header, field='missing')
+
+        with pytest.raises(TypeError):
+            Dispatcher({}, self.Data, field='count')
+
+        with pytest.raises(TypeError):
+            Dispatcher({}, (0, '2H'))
@@ -3,11 +3,14 @@
 """Tests for the starstruct class"""
 
 # import struct
+import hashlib
 import unittest
+import zlib
 from binascii import crc32
 
 import pytest
 
+from starstruct.elementcallable import Incremental, PendingChecks
 from starstruct.message import Message
 # from starstruct.modes import Mode
 
@@ -280,3 +283,94 @@ class TestStarStruct(unittest.TestCase):
         # This time it won't fail because we set False for this message
         unpacked = AdderMessageFalse.unpack(modified_packed)
         assert unpacked.item_a == 2
+
+    def test_spans_are_not_repacked(self):
+        received = []
+
+        def checker(data):
+            received.append(data)
+            return crc32(data)
+
+        CRCedMessage = Message('CRCedMessage', [
+            ('length_in_objects', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length_in_objects'),
+            ('crc', 'I', checker, [b'vardata']),
+        ])
+
+        test_data = {
+            'vardata': [
+                {'x': 1, 'y': 2},
+                {'x': 3, 'y': 4},
+            ],
+        }
+
+        packed = CRCedMessage.pack(test_data)
+        assert isinstance(received[-1], memoryview)
+        assert bytes(received[-1]) == b'\x01\x02\x03\x04'
+
+        unpacked = CRCedMessage.unpack(packed)
+        assert isinstance(received[-1], memoryview)
+        assert unpacked.crc == crc32(b'\x01\x02\x03\x04')
+
+        with pytest.raises(ValueError):
+            CRCedMessage.unpack(packed[:-1] + bytes([packed[-1] ^ 0xFF]))
+
+    def test_incremental_checksum(self):
+        FramedMessage = Message('FramedMessage', [
+            ('header', 'H'),
+            ('payload', self.Repeated, 2),
+            ('crc', 'I', Incremental(zlib.crc32), [b'header', b'payload']),
+            ('digest', '32s', Incremental(hashlib.sha256), [b'header', b'payload']),
+        ])
+
+        test_data = {
+            'header': 0x1234,
+            'payload': [
+                {'x': 1, 'z': 2},
+                {'x': 3, 'z': 4},
+            ],
+        }
+
+        packed = FramedMessage.pack(test_data)
+        covered = packed[:2 + 2 * len(self.Repeated)]
+        assert FramedMessage.make(test_data).crc == zlib.crc32(covered)
+
+        unpacked = FramedMessage.unpack(packed)
+        assert unpacked.crc == zlib.crc32(covered)
+        assert unpacked.digest == hashlib.sha256(covered).digest()
+
+    def test_deferred_checks(self):
+        CRCedMessage = Message('CRCedMessage', [
+            ('payload', self.Repeated, 2),
+            ('crc', 'I', crc32, [b'payload']),
+        ])
+
+        frames = [
+            CRCedMessage.pack({'payload': [{'x': i, 'z': 2 * i}, {'x': 3, 'z': 4}]})
+            for i in range(8)
+        ]
+        corrupted = frames[3][:-1] + bytes([frames[3][-1] ^ 0xFF])
+
+        checks = PendingChecks()
+        unpacked = [CRCedMessage.unpack(frame, checks=checks) for frame in frames]
+        assert len(checks) == len(frames)
+        assert unpacked[5].payload[0].x == 5
+
+        checks.verify_batch(workers=2)
+        assert len(checks) == 0
+
+        # The corrupted frame only fails once the checks are verified
+        bad = CRCedMessage.unpack(corrupted, checks=checks)
+        assert bad.payload[0].x == 3
+        with pytest.raises(ValueError):
+            checks.verify_batch()
+
+        # Checks are skipped by not verifying them
+        checks.clear()
+        CRCedMessage.unpack(corrupted, checks=checks)
+        checks.clear()
+        checks.verify_batch()
+
+        # Without a PendingChecks object the check is made inline again
+        with pytest.raises(ValueError):
+            CRCedMessage.unpack(corrupted)
@@ -5,6 +5,8 @@
 
 import unittest
 
+import pytest
+
 from starstruct.message import Message
 from starstruct.modes import Mode
 
@@ -80,3 +82,26 @@ class TestElementConstant(unittest.TestCase):
         unpacked = TestStruct.unpack(packed)
         assert unpacked.regular == 8
         assert unpacked.middle_constant == (0xAB, 0xBA)
+
+    def test_unpack_bad_constant(self):
+        TestStruct = Message('TestStruct', [
+            ('regular', 'B'),
+            ('ending_sequence', 'II', (0xAB, 0xBA)),
+        ], Mode.Little)
+
+        test_bytes = b'\x08\xab\x00\x00\x00\xbb\x00\x00\x00'
+
+        with pytest.raises(ValueError):
+            TestStruct.unpack(test_bytes)
+
+    def test_update_mode(self):
+        TestStruct = Message('TestStruct', [
+            ('regular', 'B'),
+            ('ending_sequence', 'H', (0xABCD,)),
+        ], Mode.Little)
+
+        assert TestStruct.pack(regular=1) == b'\x01\xcd\xab'
+
+        TestStruct.update(Mode.Big)
+        assert TestStruct.pack(regular=1) == b'\x01\xab\xcd'
+        assert TestStruct.unpack(b'\x01\xab\xcd').ending_sequence == (0xABCD,)
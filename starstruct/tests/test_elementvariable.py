@@ -3,11 +3,15 @@
 """Tests for the starstruct class"""
 
 import enum
+import io
 import struct
 import unittest
+from binascii import crc32
 
 import pytest
 
+from starstruct.elementcallable import Incremental
+from starstruct.elementvariable import Columns, LazyRecords
 from starstruct.message import Message
 # from starstruct.modes import Mode
 
@@ -364,3 +368,210 @@ class TestStarStruct(unittest.TestCase):
         assert len(made.vardata) == 2
         assert made.single_data.x == 6
         assert made.single_data.y == 11
+
+    def test_fixed_size_unpack(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'H', 'vardata'),
+            ('vardata', self.Repeated, 'length'),
+            ('repeated_data', self.VarTest, 2),
+        ])
+
+        test_data = {
+            'vardata': [{'x': i, 'z': 1000 + i} for i in range(100)],
+            'repeated_data': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+        }
+
+        packed = TestStruct.pack(test_data)
+        unpacked = TestStruct.unpack(packed)
+        assert unpacked.length == 100
+        assert unpacked.vardata == [self.Repeated.make(item) for item in test_data['vardata']]
+        assert unpacked.repeated_data == [self.VarTest.make(item) for item in test_data['repeated_data']]
+        assert unpacked.pack() == packed
+
+        with pytest.raises(struct.error):
+            TestStruct.unpack(packed[:-3])
+
+    def test_columns(self):
+        Sample = Message('Sample', [
+            ('time', 'I'),
+            ('pad', 'x'),
+            ('value', 'h'),
+        ])
+
+        TestStruct = Message('TestStruct', [
+            ('count', 'H', 'samples'),
+            ('samples', Sample, 'count', Columns),
+        ])
+
+        test_data = {
+            'samples': [{'time': i, 'value': -i} for i in range(50)],
+        }
+
+        packed = TestStruct.pack(test_data)
+        unpacked = TestStruct.unpack(packed)
+
+        assert isinstance(unpacked.samples, Columns)
+        assert len(unpacked.samples) == 50
+        assert unpacked.samples.column('value')[10] == -10
+        assert unpacked.samples[-1] == Sample.make(time=49, value=-49)
+        assert unpacked.samples[10:12] == [Sample.make(time=10, value=-10), Sample.make(time=11, value=-11)]
+        assert list(unpacked.samples) == [Sample.make(item) for item in test_data['samples']]
+        assert TestStruct.pack(unpacked._asdict()) == packed
+
+        empty = TestStruct.unpack(TestStruct.pack(samples=[]))
+        assert len(empty.samples) == 0
+        assert list(empty.samples) == []
+
+    def test_columns_requires_fixed_size(self):
+        with pytest.raises(TypeError):
+            Message('TestStruct', [
+                ('count', 'H', 'names'),
+                ('names', Message('Named', [('name', '4s')]), 'count', Columns),
+            ])
+
+    def test_lazy_records(self):
+        TestStruct = Message('TestStruct', [
+            ('count', 'I', 'vardata'),
+            ('vardata', self.Repeated, 'count', LazyRecords),
+            ('trailer', 'B'),
+        ])
+
+        test_data = {
+            'vardata': [{'x': i % 256, 'z': i} for i in range(1000)],
+            'trailer': 7,
+        }
+
+        packed = TestStruct.pack(test_data)
+        unpacked = TestStruct.unpack(packed)
+
+        assert isinstance(unpacked.vardata, LazyRecords)
+        assert len(unpacked.vardata) == 1000
+        assert unpacked.trailer == 7
+        assert unpacked.vardata[-1] == self.Repeated.make(x=999 % 256, z=999)
+        assert unpacked.vardata[3].z == 3
+
+        tail = unpacked.vardata[-3:]
+        assert isinstance(tail, LazyRecords)
+        assert len(tail) == 3
+        assert [item.z for item in tail] == [997, 998, 999]
+        assert [item.z for item in unpacked.vardata[0:10:5]] == [0, 5]
+        assert len(unpacked.vardata[5:2]) == 0
+
+        with pytest.raises(IndexError):
+            unpacked.vardata[1000]
+
+        assert unpacked.vardata == [self.Repeated.make(item) for item in test_data['vardata']]
+        assert unpacked.pack() == packed
+
+    def test_pack_stream(self):
+        TestStruct = Message('TestStruct', [
+            ('length_in_objects', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length_in_objects'),
+            (b'length_in_bytes', 'I', 'bytesdata'),
+            ('bytesdata', self.VarTest, b'length_in_bytes'),
+            ('crc', 'I', Incremental(crc32), [b'length_in_objects', b'vardata']),
+        ])
+
+        def generate(count):
+            for i in range(count):
+                yield {'x': i % 256, 'y': (i * 3) % 256}
+
+        test_data = {
+            'vardata': [{'x': i % 256, 'y': (i * 3) % 256} for i in range(1000)],
+            'length_in_bytes': 2 * 2,
+            'bytesdata': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+        }
+        expected = TestStruct.pack(test_data)
+
+        out = bytearray(b'prefix')
+        written = TestStruct.pack_stream(out, {
+            'vardata': generate(1000),
+            'bytesdata': iter(test_data['bytesdata']),
+        })
+        assert written == len(expected)
+        assert bytes(out) == b'prefix' + expected
+
+        unpacked = TestStruct.unpack(expected)
+        assert unpacked.length_in_objects == 1000
+        assert unpacked.length_in_bytes == 4
+
+        # A supplied byte length must match the items
+        out = bytearray()
+        TestStruct.pack_stream(out, dict(test_data, vardata=generate(1000)))
+        assert bytes(out) == expected
+
+        with pytest.raises(ValueError):
+            TestStruct.pack_stream(bytearray(), dict(test_data, length_in_bytes=100))
+
+    def test_pack_stream_file(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+            ('trailer', 'B'),
+        ])
+
+        out = io.BytesIO()
+        items = ({'x': i, 'y': i} for i in range(10))
+        TestStruct.pack_stream(out, vardata=items, trailer=9)
+
+        unpacked = TestStruct.unpack(out.getvalue())
+        assert unpacked.length == 10
+        assert unpacked.vardata[9] == self.VarTest.make(x=9, y=9)
+        assert unpacked.trailer == 9
+
+    def test_byte_length_window(self):
+        TestStruct = Message('TestStruct', [
+            (b'length_in_bytes', 'H', 'bytesdata'),
+            ('bytesdata', self.Repeated, b'length_in_bytes'),
+            ('trailer', 'B'),
+        ])
+
+        test_data = {
+            'length_in_bytes': 3 * 3,
+            'bytesdata': [{'x': i, 'z': 100 * i} for i in range(3)],
+            'trailer': 5,
+        }
+
+        packed = TestStruct.pack(test_data)
+        unpacked = TestStruct.unpack(packed)
+        assert unpacked.bytesdata == [self.Repeated.make(item) for item in test_data['bytesdata']]
+        assert unpacked.trailer == 5
+
+        # A length that isn't a whole number of items
+        with pytest.raises(ValueError):
+            TestStruct.unpack(struct.pack('H', 8) + packed[2:])
+
+        # A length longer than the rest of the buffer fails up front
+        with pytest.raises(struct.error):
+            TestStruct.unpack(struct.pack('H', 0xFFFF) + packed[2:])
+
+    def test_byte_length_window_variable_items(self):
+        Named = Message('Named', [
+            ('count', 'B', 'values'),
+            ('values', self.VarTest, 'count'),
+        ])
+
+        TestStruct = Message('TestStruct', [
+            (b'length_in_bytes', 'H', 'bytesdata'),
+            ('bytesdata', Named, b'length_in_bytes'),
+            ('trailer', 'B'),
+        ])
+
+        test_data = {
+            'length_in_bytes': 3 + 5,
+            'bytesdata': [
+                {'values': [{'x': 1, 'y': 2}]},
+                {'values': [{'x': 3, 'y': 4}, {'x': 5, 'y': 6}]},
+            ],
+            'trailer': 5,
+        }
+
+        packed = TestStruct.pack(test_data)
+        unpacked = TestStruct.unpack(packed)
+        assert len(unpacked.bytesdata) == 2
+        assert unpacked.bytesdata[1].values[1].y == 6
+        assert unpacked.trailer == 5
+
+        # The last item runs past the end of the declared window
+        with pytest.raises(struct.error):
+            TestStruct.unpack(struct.pack('H', 7) + packed[2:])
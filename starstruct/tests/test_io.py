@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""Tests for reading record files"""
+
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from starstruct.io import RecordFile
+from starstruct.message import Message
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestRecordFile(unittest.TestCase):
+    """RecordFile tests"""
+
+    Sample = Message('Sample', [
+        ('time', 'I'),
+        ('value', 'h'),
+    ])
+
+    Named = Message('Named', [
+        ('count', 'B', 'samples'),
+        ('samples', Sample, 'count'),
+    ])
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, 'wb') as out:
+            out.write(data)
+
+    def test_fixed_records(self):
+        records = [{'time': i, 'value': -i} for i in range(100)]
+        self.write(b''.join(self.Sample.pack(record) for record in records) + b'\x01\x02')
+
+        with RecordFile(self.path, self.Sample) as record_file:
+            assert len(record_file) == 100
+            assert record_file[0] == self.Sample.make(records[0])
+            assert record_file[-1] == self.Sample.make(records[-1])
+            assert list(record_file) == [self.Sample.make(record) for record in records]
+            assert list(record_file.offsets())[:3] == [0, 6, 12]
+
+            with pytest.raises(IndexError):
+                record_file[100]
+
+    def test_variable_records(self):
+        records = [{'samples': [{'time': j, 'value': i} for j in range(i % 4)]} for i in range(20)]
+        packed = [self.Named.pack(record) for record in records]
+        self.write(b''.join(packed))
+
+        with RecordFile(self.path, self.Named) as record_file:
+            unpacked = list(record_file)
+            assert len(unpacked) == 20
+            assert unpacked[5].samples[0].value == 5
+            assert unpacked == [self.Named.unpack(data) for data in packed]
+
+            offsets = list(record_file.offsets())
+            assert offsets[1] == len(packed[0])
+
+            with pytest.raises(TypeError):
+                len(record_file)
+
+    def test_empty_file(self):
+        with RecordFile(self.path, self.Sample) as record_file:
+            assert len(record_file) == 0
+            assert list(record_file) == []
+
+    def test_index(self):
+        records = [{'samples': [{'time': j, 'value': i} for j in range(i % 4)]} for i in range(20)]
+        packed = [self.Named.pack(record) for record in records]
+        self.write(b''.join(packed) + packed[1][:2])
+        index_path = self.path + '.idx'
+        self.addCleanup(os.remove, index_path)
+
+        with RecordFile(self.path, self.Named, index=True) as record_file:
+            assert len(record_file) == 20
+            assert record_file[7] == self.Named.unpack(packed[7])
+            assert record_file[-1] == self.Named.unpack(packed[-1])
+            assert os.path.exists(index_path)
+
+        # Append records (completing the partial record) and extend the index
+        with open(self.path, 'ab') as out:
+            out.write(packed[1][2:] + packed[3])
+
+        with RecordFile(self.path, self.Named, index=True) as record_file:
+            assert len(record_file) == 22
+            assert record_file[20] == self.Named.unpack(packed[1])
+            assert record_file[21] == self.Named.unpack(packed[3])
+
+        # An index made for another message is rebuilt
+        Other = Message('Other', [
+            ('count', 'H', 'samples'),
+            ('samples', self.Sample, 'count'),
+        ])
+        assert Other.fingerprint() != self.Named.fingerprint()
+        with RecordFile(self.path, Other, index=True) as record_file:
+            assert record_file.index.fingerprint == Other.fingerprint()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""Tests for the decode limits"""
+
+import struct
+import unittest
+
+import pytest
+
+import starstruct.limits
+from starstruct.limits import Limits, LimitError
+from starstruct.message import Message
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestLimits(unittest.TestCase):
+    """Decode limit tests"""
+
+    VarTest = Message('VarTest', [
+        ('x', 'B'),
+        ('y', 'B'),
+    ])
+
+    def tearDown(self):
+        starstruct.limits.set_defaults()
+
+    def test_impossible_count(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'Q', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+        ])
+
+        # Claims 2^64 - 1 items, but there are only 4 bytes left
+        with pytest.raises(struct.error):
+            TestStruct.unpack(struct.pack('Q', 2 ** 64 - 1) + b'\x01\x02\x03\x04')
+
+    def test_impossible_count_variable_items(self):
+        Nested = Message('Nested', [
+            ('length', 'B', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+            ('trailer', 'H'),
+        ])
+
+        TestStruct = Message('TestStruct', [
+            ('length', 'Q', 'vardata'),
+            ('vardata', Nested, 'length'),
+        ])
+
+        # Each nested item needs at least 3 bytes
+        with pytest.raises(struct.error):
+            TestStruct.unpack(struct.pack('Q', 3) + b'\x00' * 8)
+
+    def test_max_items(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+        ], limits=Limits(max_items=3))
+
+        packed = TestStruct.pack(vardata=[{'x': i, 'y': i} for i in range(3)])
+        assert len(TestStruct.unpack(packed).vardata) == 3
+
+        packed = TestStruct.pack(vardata=[{'x': i, 'y': i} for i in range(4)])
+        with pytest.raises(LimitError):
+            TestStruct.unpack(packed)
+
+    def test_max_items_byte_length(self):
+        Nested = Message('Nested', [
+            ('length', 'B', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+        ])
+
+        for item, value in ((self.VarTest, {'x': 1, 'y': 2}), (Nested, {'vardata': [{'x': 1, 'y': 2}]})):
+            TestStruct = Message('TestStruct', [
+                (b'size', 'H', 'vardata'),
+                ('vardata', item, b'size'),
+            ], limits=Limits(max_items=2))
+
+            size = len(item.pack(value))
+            packed = TestStruct.pack(size=size * 2, vardata=[value] * 2)
+            assert len(TestStruct.unpack(packed).vardata) == 2
+
+            packed = TestStruct.pack(size=size * 10, vardata=[value] * 10)
+            with pytest.raises(LimitError):
+                TestStruct.unpack(packed)
+
+    def test_max_bytes(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+        ])
+
+        packed = TestStruct.pack(vardata=[{'x': i, 'y': i} for i in range(4)])
+        assert len(TestStruct.unpack(packed).vardata) == 4
+
+        starstruct.limits.set_defaults(max_bytes=8)
+        with pytest.raises(LimitError):
+            TestStruct.unpack(packed)
+
+        # A message's own limits replace the defaults
+        TestStruct.limits = Limits(max_bytes=10)
+        assert len(TestStruct.unpack(packed).vardata) == 4
+
+    def test_max_bytes_partial(self):
+        TestStruct = Message('TestStruct', [
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+        ], limits=Limits(max_bytes=8))
+
+        # Only the bytes of the message count, not the data after it
+        small = TestStruct.pack(vardata=[{'x': 1, 'y': 2}])
+        large = TestStruct.pack(vardata=[{'x': i, 'y': i} for i in range(4)])
+        (msg, unused) = TestStruct.unpack_partial(small * 10)
+        assert len(msg.vardata) == 1
+        assert len(unused) == len(small) * 9
+        assert TestStruct.unpack_from(small * 10, len(small)).vardata == msg.vardata
+
+        with pytest.raises(LimitError):
+            TestStruct.unpack_partial(large + small)
+        with pytest.raises(LimitError):
+            TestStruct.unpack(small + b'\x00' * 8)
+
+    def test_max_depth(self):
+        Inner = Message('Inner', [('value', 'B'), ('text', '2s')])
+        Middle = Message('Middle', [('inner', Inner)])
+        Outer = Message('Outer', [('middle', Middle)])
+
+        packed = Outer.pack(middle={'inner': {'value': 1, 'text': 'ab'}})
+        assert Outer.unpack(packed).middle[0].inner[0].value == 1
+
+        Outer.limits = Limits(max_depth=2)
+        with pytest.raises(LimitError):
+            Outer.unpack(packed)
+
+        # The limits are reset once the unpack fails
+        assert Middle.unpack(packed[:3]).inner[0].value == 1
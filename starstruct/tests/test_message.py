@@ -6,7 +6,15 @@
 import unittest
 import pytest
 
+import copy
 import enum
+import gc
+import pickle
+import struct
+from zlib import crc32
+
+from starstruct.elementcallable import Incremental, PendingChecks
+from starstruct.elementdiscriminated import LazyPayload
 from starstruct.message import Message
 from starstruct.modes import Mode
 
@@ -229,3 +237,327 @@ class TestStarStruct(unittest.TestCase):
         assert 'pack' in str(e)
         assert '_elements' in str(e)
         assert '_fields' in str(e)
+
+    def test_raw_enums(self):
+        """Test the discriminated dispatch with raw enum values."""
+        raw_msg = Message('test', self.teststruct, Mode.Little, raw_enums=True)
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                unpacked_msg = raw_msg.unpack(self.testbytes['little'][idx])
+                self.assertEqual(unpacked_msg.type, self.testvalues[idx]['type'].value)
+                self.assertEqual(unpacked_msg, raw_msg.make(**self.testvalues[idx]))
+
+                # Raw values and enum names can both be used to pack
+                values = dict(self.testvalues[idx])
+                values['type'] = values['type'].value
+                self.assertEqual(test_msg.pack(values), self.testbytes['little'][idx])
+                values['type'] = self.testvalues[idx]['type'].name
+                self.assertEqual(test_msg.pack(values), self.testbytes['little'][idx])
+
+                # Packing the unpacked tuple gives back the same bytes
+                self.assertEqual(unpacked_msg.pack(), self.testbytes['little'][idx])
+
+        with pytest.raises(ValueError):
+            raw_msg.unpack(self.testbytes['little'][0].replace(b'\x01\x00\x00\x32', b'\x07\x00\x00\x32'))
+
+    def test_lazy_payload(self):
+        """Test unpacking discriminated payloads lazily."""
+        lazy_struct = self.teststruct[:-1] + [self.teststruct[-1] + (LazyPayload,)]
+        lazy_msg = Message('test', lazy_struct, Mode.Little)
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                unpacked_msg = lazy_msg.unpack(packed)
+                self.assertIsInstance(unpacked_msg.data, LazyPayload)
+                self.assertIsNone(unpacked_msg.data._value)  # pylint: disable=protected-access
+
+                # Repacking forwards the original bytes without decoding them
+                self.assertEqual(unpacked_msg.pack(), packed)
+                self.assertIsNone(unpacked_msg.data._value)  # pylint: disable=protected-access
+
+                self.assertEqual(unpacked_msg.data, test_msg.unpack(packed).data)
+                for key, value in self.testvalues[idx]['data'].items():
+                    self.assertEqual(getattr(unpacked_msg.data, key), value)
+
+    def test_measure(self):
+        """Test finding the size of a message without unpacking it."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                self.assertEqual(test_msg.measure(packed + b'\xde\xad'), len(packed))
+
+    def test_unpack_from(self):
+        """Test unpacking from an offset, ignoring any extra bytes."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                buf = b'\xde\xad' + self.testbytes['little'][idx] + b'\xbe\xef'
+                self.assertEqual(test_msg.unpack_from(buf, 2), test_msg.make(**self.testvalues[idx]))
+
+    def test_pickle(self):
+        """Test pickling messages and unpacked records."""
+        test_msg = Message('pickled', self.teststruct, Mode.Little)
+        self.assertIs(Message.lookup(test_msg.fingerprint()), test_msg)
+        self.assertIs(pickle.loads(pickle.dumps(test_msg)), test_msg)
+
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                unpacked_msg = test_msg.unpack(packed)
+                pickled = pickle.dumps(unpacked_msg)
+                self.assertIn(packed, pickled)
+
+                copied = pickle.loads(pickled)
+                self.assertIs(type(copied), type(unpacked_msg))
+                self.assertEqual(copied, unpacked_msg)
+
+        # Records only refer to their message by fingerprint, so messages
+        # using local functions can be pickled too
+        def double(value):
+            return value * 2
+
+        local_msg = Message('local', [('a', 'B'), ('b', 'B', double, ['a'])])
+        record = local_msg.make(a=3)
+        pickled = pickle.dumps(record)
+        self.assertLess(len(pickled), 100)
+        self.assertEqual(pickle.loads(pickled), record)
+        self.assertIs(pickle.loads(pickle.dumps(local_msg)), local_msg)
+
+        # A fingerprint that matches several messages is ambiguous
+        twin_msg = Message('local', [('a', 'B'), ('b', 'B', double, ['a'])])
+        with pytest.raises(ValueError):
+            pickle.loads(pickled)
+        del local_msg, record
+        self.assertEqual(pickle.loads(pickled).pack(), twin_msg.pack(a=3))
+
+        # A message that isn't defined can only be unpickled from its fields
+        pickled = pickle.dumps(test_msg)
+        portable = pickle.dumps(test_msg.portable())
+        self.assertIs(pickle.loads(portable), test_msg)
+        fingerprint = test_msg.fingerprint()
+        expected = test_msg.pack(self.testvalues[0])
+        del test_msg, unpacked_msg, copied
+        gc.collect()
+        with pytest.raises(KeyError):
+            Message.lookup(fingerprint)
+        with pytest.raises(KeyError):
+            pickle.loads(pickled)
+
+        copied_msg = pickle.loads(portable)
+        self.assertEqual(copied_msg.fingerprint(), fingerprint)
+        self.assertEqual(copied_msg.pack(self.testvalues[0]), expected)
+        self.assertIs(pickle.loads(pickled), copied_msg)
+
+    def test_deepcopy(self):
+        """Test copying messages and records without pickling them."""
+        point = Message('copied', [('a', 'B'), ('b', 'H')], Mode.Little)
+
+        # Records don't have to be packable to be copied
+        record = point.make(a=1, b=2)._replace(a=300)
+        self.assertEqual(copy.deepcopy(record), record)
+
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        unpacked_msg = test_msg.unpack(self.testbytes['little'][1])
+        copied = copy.deepcopy(unpacked_msg)
+        self.assertEqual(copied, unpacked_msg)
+        self.assertIsNot(copied.vardata, unpacked_msg.vardata)
+
+        # Copied messages can be changed independently
+        copied_msg = copy.deepcopy(point)
+        self.assertIsNot(copied_msg, point)
+        copied_msg.update(Mode.Big)
+        self.assertEqual(point.pack(a=1, b=2), b'\x01\x02\x00')
+        self.assertEqual(copied_msg.pack(a=1, b=2), b'\x01\x00\x02')
+
+    def test_fingerprint(self):
+        """Test that messages with different fields have different fingerprints."""
+        def fingerprints(*fields):
+            return {Message('fingerprint', [field]).fingerprint() for field in fields}
+
+        # Constant values
+        assert len(fingerprints(('a', 'B', (0xAA,)), ('a', 'B', (0xBB,)))) == 2
+
+        # Checksum error flags, and lambdas (or local functions) with the same name
+        assert len(fingerprints(('a', 'B', lambda: 1, [], True), ('a', 'B', lambda: 1, [], False))) == 2
+        assert len(fingerprints(('a', 'B', lambda: 1, []), ('a', 'B', lambda: 2, []))) == 2
+        offset = 1
+        assert len(fingerprints(('a', 'B', lambda: offset, []), ('a', 'B', lambda: offset + 1, []))) == 2
+
+        # Identical fields
+        assert len(fingerprints(('a', 'B', lambda: 1, []), ('a', 'B', lambda: 1, []))) == 1
+
+    def test_pack_into(self):
+        """Test packing into a writable buffer at an offset."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                buf = bytearray(len(packed) + 4)
+                self.assertEqual(test_msg.pack_into(buf, 2, self.testvalues[idx]), len(packed))
+                self.assertEqual(bytes(buf), b'\x00\x00' + packed + b'\x00\x00')
+
+                with pytest.raises(struct.error):
+                    test_msg.pack_into(buf, 5, self.testvalues[idx])
+
+    def test_patch(self):
+        """Test changing fields of a packed message in place."""
+        sample = Message('Sample', [('time', 'I'), ('value', 'h')])
+        telemetry = Message('Telemetry', [
+            ('sequence', 'I'),
+            ('type', 'B', SimpleEnum),
+            ('count', 'H', 'samples'),
+            ('samples', sample, 'count'),
+            (b'size', 'B', 'notes'),
+            ('notes', sample, b'size'),
+            ('crc', 'I', Incremental(crc32), [b'sequence', b'samples']),
+            ('tail', 'H'),
+        ], Mode.Little)
+
+        values = {
+            'sequence': 1,
+            'type': SimpleEnum.one,
+            'samples': [{'time': 1, 'value': 2}],
+            'size': 6,
+            'notes': [{'time': 3, 'value': 4}],
+            'tail': 7,
+        }
+        buf = bytearray(telemetry.pack(values))
+
+        # Fixed size fields, before and after the variable elements
+        self.assertEqual(telemetry.patch(buf, sequence=2, type='two', tail=8), len(buf))
+        values.update(sequence=2, type=SimpleEnum.two, tail=8)
+        self.assertEqual(bytes(buf), telemetry.pack(values))
+
+        # Variable elements, and their lengths
+        samples = [{'time': 5, 'value': 6}, {'time': 7, 'value': 8}]
+        notes = [{'time': 9, 'value': 10}, {'time': 11, 'value': 12}, {'time': 13, 'value': 14}]
+        self.assertEqual(telemetry.patch(buf, {'samples': samples, 'notes': notes}), len(buf))
+        values.update(samples=samples, notes=notes, size=18)
+        self.assertEqual(bytes(buf), telemetry.pack(values))
+        telemetry.unpack(buf)
+
+        # Explicit checksums are not recomputed
+        telemetry.patch(buf, sequence=3, crc=0)
+        self.assertEqual(telemetry.unpack_from(buf, 0, checks=PendingChecks()).crc, 0)
+
+        # Checksums of the values (not the bytes) of variable elements
+        def total(sequence, samples):
+            return sequence + sum(item.value for item in samples)
+
+        summed = Message('Summed', [
+            ('sequence', 'I'),
+            ('count', 'H', 'samples'),
+            ('samples', sample, 'count'),
+            ('chk', 'I', total, ['sequence', 'samples']),
+        ], Mode.Little)
+        summed_values = {'sequence': 1, 'samples': [{'time': 1, 'value': 2}, {'time': 3, 'value': 4}]}
+        summed_buf = bytearray(summed.pack(summed_values))
+        self.assertEqual(summed.patch(summed_buf, sequence=5), len(summed_buf))
+        summed_values.update(sequence=5)
+        self.assertEqual(bytes(summed_buf), summed.pack(summed_values))
+        self.assertEqual(summed.unpack(summed_buf).chk, 11)
+
+        with pytest.raises(AttributeError):
+            telemetry.patch(buf, missing=1)
+        with pytest.raises(TypeError):
+            telemetry.patch(memoryview(buf), samples=[])
+
+    def test_tuple_pack(self):
+        """Test packing unpacked and made tuples."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+
+                # The records hold lists, so they are packed again every time
+                unpacked_msg = test_msg.unpack(packed)
+                self.assertEqual(unpacked_msg.pack(), packed)
+                unpacked_msg.vardata.append(self.teststruct[9][1].make(x=5, y=6))
+                self.assertEqual(unpacked_msg.pack(), test_msg.pack(unpacked_msg))
+                self.assertNotEqual(unpacked_msg.pack(), packed)
+
+                made_msg = test_msg.make(**self.testvalues[idx])
+                self.assertEqual(made_msg.pack(), packed)
+
+                changed_msg = made_msg._replace(b=made_msg.b // 2)
+                self.assertEqual(test_msg.unpack(changed_msg.pack()).b, made_msg.b // 2)
+
+    def test_tuple_pack_memo(self):
+        """Test that the packed bytes of immutable records are kept."""
+        point = Message('point', [('a', 'H'), ('b', 'b')], Mode.Little)
+        packed = b'\x01\x00\x02'
+
+        # The unpacked bytes are kept
+        unpacked_msg = point.unpack(packed)
+        self.assertIs(unpacked_msg.pack(), packed)
+
+        unpacked_msg = point.unpack(bytearray(packed))
+        self.assertEqual(unpacked_msg.pack(), packed)
+        self.assertIs(unpacked_msg.pack(), unpacked_msg.pack())
+
+        # Until the message is updated
+        made_msg = point.make(a=1, b=2)
+        self.assertEqual(made_msg.pack(), packed)
+        point.update(Mode.Big)
+        self.assertEqual(made_msg.pack(), b'\x00\x01\x02')
+        self.assertEqual(unpacked_msg.pack(), b'\x00\x01\x02')
+
+        # Or a message nested in it is updated, but not when other messages are
+        outer = Message('outer', [('point', point), ('c', 'B')], Mode.Big, pack_cache=2)
+        outer_msg = outer.unpack(b'\x00\x01\x02\x03')
+        self.assertEqual(outer.pack(outer_msg), b'\x00\x01\x02\x03')
+        Message('other', [('a', 'H')])
+        self.assertIs(outer_msg.pack(), outer_msg.pack())
+        point.update(Mode.Little)
+        self.assertEqual(outer_msg.pack(), b'\x01\x00\x02\x03')
+        self.assertEqual(outer.pack(outer_msg), b'\x01\x00\x02\x03')
+
+    def test_pack_positional(self):
+        """Test packing tuples and sequences by field index."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                unpacked_msg = test_msg.unpack(bytearray(packed))
+                self.assertEqual(test_msg.pack(unpacked_msg), packed)
+                self.assertEqual(test_msg.pack(list(unpacked_msg)), packed)
+
+                # Nested items can be tuples too
+                values = unpacked_msg._replace(vardata=[tuple(item) for item in unpacked_msg.vardata])
+                self.assertEqual(test_msg.pack(tuple(values)), packed)
+
+                buf = bytearray()
+                test_msg.pack_stream(buf, unpacked_msg)
+                self.assertEqual(bytes(buf), packed)
+
+        # Named tuples of other messages are packed by name
+        other = Message('other', [('y', 'B'), ('x', 'B')])
+        vartest = self.teststruct[9][1]
+        self.assertEqual(vartest.pack(other.make(y=2, x=1)), b'\x01\x02')
+
+        with pytest.raises(ValueError):
+            vartest.pack((1, 2, 3))
+
+    def test_pack_trusted(self):
+        """Test packing made values without converting them again."""
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        trusted_msg = Message('test', self.teststruct, Mode.Little, trusted=True)
+        for idx in range(len(self.testvalues)):
+            with self.subTest(idx):  # pylint: disable=no-member
+                packed = self.testbytes['little'][idx]
+                unpacked_msg = test_msg.unpack(bytearray(packed))
+                self.assertEqual(test_msg.pack_trusted(unpacked_msg), packed)
+                self.assertEqual(test_msg.pack_trusted(**unpacked_msg._asdict()), packed)
+                self.assertEqual(trusted_msg.pack(unpacked_msg), packed)
+
+        # Fixed size messages are packed with a single struct
+        fixed = Message('fixed', [('a', 'H'), ('b', 'b'), ('c', 'I')], Mode.Big)
+        self.assertEqual(fixed.pack_trusted(a=1, b=-2, c=3), b'\x00\x01\xfe\x00\x00\x00\x03')
+        self.assertEqual(fixed.pack_trusted(fixed.make(a=1, b=-2, c=3)), b'\x00\x01\xfe\x00\x00\x00\x03')
+
+        # Values that are not made are not converted
+        with pytest.raises(struct.error):
+            fixed.pack_trusted(a=b'\x00\x01', b=-2, c=3)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""Tests for overlays of packed messages"""
+
+import enum
+import mmap
+import struct
+import unittest
+from decimal import Decimal
+from zlib import crc32
+
+import pytest
+
+from starstruct.bitfield import BitField
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class Kind(enum.Enum):
+    """Kinds of status"""
+    idle = 1
+    busy = 2
+
+
+class Flags(enum.Enum):
+    """Status flags"""
+    ready = 1
+    error = 2
+    remote = 4
+
+
+Status = Message('Status', [
+    ('sequence', 'I'),
+    ('pad', '2x'),
+    ('kind', 'B', Kind),
+    ('flags', 'B', BitField(Flags)),
+    ('temperature', 'F', 'i', 8),
+    ('name', '6s'),
+    ('magic', 'H', (0xbeef,)),
+    ('crc', 'I', crc32, [b'sequence']),
+], Mode.Big)
+
+values = {
+    'sequence': 1,
+    'kind': Kind.idle,
+    'flags': [Flags.ready],
+    'temperature': '21.5',
+    'name': 'ab',
+    'magic': (0xbeef,),
+}
+
+
+# pylint: disable=line-too-long,invalid-name,attribute-defined-outside-init
+class TestOverlay(unittest.TestCase):
+    """Overlay tests"""
+
+    def test_read(self):
+        buf = bytearray(b'\xff' + Status.pack(values))
+        view = Status.overlay(buf, 1)
+        assert view.sequence == 1
+        assert view.kind == Kind.idle
+        assert view.flags == frozenset([Flags.ready])
+        assert view.temperature == Decimal('21.5')
+        assert view.name == 'ab'
+        assert view.magic == (0xbeef,)
+        assert view.crc == crc32(struct.pack('>I', 1))
+        assert view._unpack() == Status.unpack(buf[1:])  # pylint: disable=protected-access
+        assert bytes(view) == bytes(buf[1:])
+
+    def test_write(self):
+        buf = bytearray(Status.pack(values))
+        view = Status.overlay(buf)
+        view.sequence += 1
+        view.kind = 'busy'
+        view.flags = [Flags.error, Flags.remote]
+        view.temperature = '-3.25'
+        view.name = 'xyz'
+
+        # The checksum is left as it was
+        expected = dict(values, sequence=2, kind=Kind.busy, flags=[Flags.error, Flags.remote],
+                        temperature='-3.25', name='xyz')
+        assert bytes(buf[:-4]) == Status.pack(expected)[:-4]
+        assert view.crc == crc32(struct.pack('>I', 1))
+
+        view._update(sequence=7, crc=0)  # pylint: disable=protected-access
+        assert (view.sequence, view.crc) == (7, 0)
+        with pytest.raises(AttributeError):
+            view._update(missing=1)  # pylint: disable=protected-access
+
+        # Constants can't be written
+        with pytest.raises(AttributeError):
+            view.magic = (1,)
+
+    def test_mmap(self):
+        packed = Status.pack(values)
+        mapping = mmap.mmap(-1, len(packed) * 2)
+        mapping[len(packed):] = packed
+
+        view = Status.overlay(mapping, len(packed))
+        view.sequence = 42
+        assert mapping[len(packed):len(packed) + 4] == struct.pack('>I', 42)
+        mapping.close()
+
+    def test_invalid(self):
+        with pytest.raises(struct.error):
+            Status.overlay(bytearray(4))
+
+        item = Message('Item', [('a', 'B')])
+        variable = Message('Variable', [('length', 'B', 'data'), ('data', item, 'length')])
+        with pytest.raises(TypeError):
+            variable.overlay(bytearray(8))
+
+        aligned = Message('Aligned', [('a', 'b'), ('b', 'H')], Mode.Native, 4)
+        with pytest.raises(TypeError):
+            aligned.overlay(bytearray(8))
+
+    def test_update(self):
+        msg = Message('Update', [('a', 'H')], Mode.Little)
+        buf = bytearray(b'\x01\x00')
+        assert msg.overlay(buf).a == 1
+
+        msg.update(Mode.Big)
+        assert msg.overlay(buf).a == 256
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""Tests for unpacking files in parallel"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.parallel import unpack_file
+
+
+Sample = Message('Reading', [
+    ('time', 'I'),
+    ('value', 'h'),
+])
+
+Named = Message('Named', [
+    ('count', 'B', 'samples'),
+    ('samples', Sample, 'count'),
+])
+
+
+def total(records):
+    """Sum the values of a chunk of samples"""
+    return sum(record.value for record in records)
+
+
+def slow_total(records):
+    """Sum the values of a chunk of samples, slowly"""
+    time.sleep(0.1)
+    return total(records)
+
+
+def count_samples(records):
+    """Count the samples in a chunk of records"""
+    return [record.count for record in records]
+
+
+# pylint: disable=line-too-long,invalid-name
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='requires Python 3.7')
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='requires fork')
+class TestParallel(unittest.TestCase):
+    """Parallel unpack tests"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.context = multiprocessing.get_context('fork')
+
+    def tearDown(self):
+        os.remove(self.path)
+        if os.path.exists(self.path + '.idx'):
+            os.remove(self.path + '.idx')
+
+    def test_fixed_records(self):
+        records = [{'time': i, 'value': i % 100} for i in range(1000)]
+        with open(self.path, 'wb') as out:
+            out.write(b''.join(Sample.pack(record) for record in records))
+
+        totals = list(unpack_file(self.path, Sample, workers=2, fn=total,
+                                  chunk_records=100, mp_context=self.context))
+        assert len(totals) == 10
+        assert sum(totals) == sum(record['value'] for record in records)
+        assert totals[1] == sum(record['value'] for record in records[100:200])
+
+    def test_variable_records(self):
+        records = [{'samples': [{'time': j, 'value': i} for j in range(i % 5)]} for i in range(200)]
+        with open(self.path, 'wb') as out:
+            out.write(b''.join(Named.pack(record) for record in records))
+
+        counts = unpack_file(self.path, Named, workers=2, fn=count_samples,
+                             chunk_records=30, mp_context=self.context)
+        assert [count for chunk in counts for count in chunk] == [i % 5 for i in range(200)]
+
+    def test_records(self):
+        records = [{'time': i, 'value': -i} for i in range(100)]
+        with open(self.path, 'wb') as out:
+            out.write(b''.join(Sample.pack(record) for record in records))
+
+        unpacked = list(unpack_file(self.path, Sample, workers=2, chunk_records=7, mp_context=self.context))
+        assert unpacked == [Sample.make(record) for record in records]
+
+    def test_variable_records_without_fn(self):
+        records = [{'samples': [{'time': j, 'value': i} for j in range(i % 5)]} for i in range(50)]
+        with open(self.path, 'wb') as out:
+            out.write(b''.join(Named.pack(record) for record in records))
+
+        unpacked = list(unpack_file(self.path, Named, workers=2, chunk_records=7, mp_context=self.context))
+        assert unpacked == [Named.make(record) for record in records]
+
+    def test_stop_early(self):
+        records = [{'time': i, 'value': i % 100} for i in range(100)]
+        with open(self.path, 'wb') as out:
+            out.write(b''.join(Sample.pack(record) for record in records))
+
+        # The remaining chunks are not unpacked once the caller stops
+        start = time.monotonic()
+        results = unpack_file(self.path, Sample, workers=1, fn=slow_total,
+                              chunk_records=5, mp_context=self.context)
+        assert next(results) == sum(range(5))
+        results.close()
+        assert time.monotonic() - start < 20 * 0.1
+
+    def test_empty_file(self):
+        assert list(unpack_file(self.path, Sample, workers=1, fn=total, mp_context=self.context)) == []
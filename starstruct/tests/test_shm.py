@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""Tests for the shared memory record ring"""
+
+import multiprocessing
+import unittest
+
+import pytest
+
+# multiprocessing.shared_memory requires Python 3.8
+pytest.importorskip('multiprocessing.shared_memory')
+
+# pylint: disable=wrong-import-position
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.shm import RecordRing
+
+
+Sample = Message('Sample', [
+    ('time', 'I'),
+    ('value', 'h'),
+], Mode.Little)
+
+
+def produce(ring, count):
+    """Put a number of samples into a ring"""
+    for i in range(count):
+        while not ring.put(time=i, value=-i):
+            pass
+    ring.close()
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestRecordRing(unittest.TestCase):
+    """RecordRing tests"""
+
+    def setUp(self):
+        self.ring = RecordRing(Sample, capacity=4)
+
+    def tearDown(self):
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_put_get(self):
+        assert self.ring.get() is None
+        assert self.ring.put(time=1, value=2)
+        assert self.ring.put({'time': 3, 'value': 4})
+        assert len(self.ring) == 2
+
+        assert self.ring.get() == Sample.make(time=1, value=2)
+        assert self.ring.get() == Sample.make(time=3, value=4)
+        assert self.ring.get() is None
+
+    def test_full(self):
+        for i in range(4):
+            assert self.ring.put(time=i, value=i)
+        assert not self.ring.put(time=4, value=4)
+
+        assert self.ring.get().time == 0
+        assert self.ring.put(time=4, value=4)
+
+    def test_get_many_wraps(self):
+        for i in range(3):
+            self.ring.put(time=i, value=i)
+        self.ring.get_many()
+
+        # These records wrap around the end of the ring
+        for i in range(4):
+            self.ring.put(time=i, value=i)
+        assert [record.time for record in self.ring.get_many(3)] == [0, 1, 2]
+        assert [record.time for record in self.ring.get_many()] == [3]
+        assert self.ring.get_many() == []
+
+    def test_peek(self):
+        assert self.ring.peek() is None
+        with pytest.raises(ValueError):
+            self.ring.advance()
+
+        self.ring.put(time=1, value=2)
+        view = self.ring.peek()
+        assert bytes(view) == Sample.pack(time=1, value=2)
+        view.release()
+        self.ring.advance()
+        assert len(self.ring) == 0
+
+    def test_attach(self):
+        with RecordRing.attach(self.ring.name, Sample) as other:
+            assert other.capacity == 4
+            other.put(time=5, value=6)
+        assert self.ring.get() == Sample.make(time=5, value=6)
+
+        other_msg = Message('Other', [('time', 'I')])
+        with pytest.raises(ValueError):
+            RecordRing.attach(self.ring.name, other_msg)
+
+    def test_invalid(self):
+        with pytest.raises(TypeError):
+            RecordRing(Message('Variable', [('length', 'B', 'data'), ('data', Sample, 'length')]), 4)
+        with pytest.raises(ValueError):
+            RecordRing(Sample, 0)
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='requires fork')
+    def test_process(self):
+        context = multiprocessing.get_context('fork')
+        producer = context.Process(target=produce, args=(self.ring, 1000))
+        producer.start()
+
+        records = []
+        while len(records) < 1000:
+            records.extend(self.ring.get_many())
+        producer.join()
+
+        assert records == [Sample.make(time=i, value=-i) for i in range(1000)]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""Tests for message templates"""
+
+import enum
+import struct
+import unittest
+from zlib import crc32
+
+import pytest
+
+from starstruct.elementcallable import Incremental
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class Kind(enum.Enum):
+    """Kinds of frame"""
+    data = 1
+    ack = 2
+
+
+def add(kind, sequence):
+    """A checksum of values"""
+    return (kind.value + sequence) & 0xff
+
+
+Frame = Message('Frame', [
+    ('magic', '2s', (b'SF',)),
+    ('kind', 'B', Kind),
+    ('sequence', 'I'),
+    ('pad', '3x'),
+    ('timestamp', 'd'),
+    ('payload', '8s'),
+    ('crc', 'I', Incremental(crc32), [b'sequence', b'timestamp', b'payload']),
+    ('total', 'B', add, ['kind', 'sequence']),
+    ('outer', 'I', crc32, [b'crc']),
+], Mode.Big)
+
+defaults = {
+    'magic': (b'SF',),
+    'kind': Kind.data,
+    'sequence': 0,
+    'timestamp': 0.0,
+    'payload': 'hello',
+}
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestTemplate(unittest.TestCase):
+    """Template tests"""
+
+    def setUp(self):
+        self.template = Frame.template(defaults)
+
+    def test_prototype(self):
+        assert self.template.pack() == Frame.pack(defaults)
+        assert len(self.template) == len(Frame.pack(defaults))
+
+    def test_changes(self):
+        for changes in ({'sequence': 7}, {'timestamp': 1.5, 'payload': 'bye'},
+                        {'kind': Kind.ack}, {'sequence': 9, 'kind': 'ack', 'payload': b'x'}):
+            with self.subTest(changes):  # pylint: disable=no-member
+                packed = self.template.pack(**changes)
+                assert packed == Frame.pack(dict(defaults, **changes))
+
+                # The packed checksums are valid
+                Frame.unpack(packed)
+
+        assert self.template.pack({'sequence': 3}) == Frame.pack(dict(defaults, sequence=3))
+
+    def test_explicit_checksum(self):
+        packed = self.template.pack(sequence=1, total=0)
+        assert struct.unpack_from('B', packed, 30)[0] == 0
+
+    def test_pack_into(self):
+        buf = bytearray(len(self.template) + 2)
+        assert self.template.pack_into(buf, 2, sequence=5) == len(self.template)
+        assert bytes(buf[2:]) == Frame.pack(dict(defaults, sequence=5))
+
+        with pytest.raises(struct.error):
+            self.template.pack_into(bytearray(4), 0, sequence=5)
+
+    def test_invalid(self):
+        with pytest.raises(AttributeError):
+            self.template.pack(missing=1)
+
+        item = Message('Item', [('a', 'B')])
+        variable = Message('Variable', [('length', 'B', 'data'), ('data', item, 'length')])
+        with pytest.raises(TypeError):
+            variable.template(length=0, data=[])